@@ -4,9 +4,11 @@ from langchain.agents import Tool, create_openai_tools_agent
 from langchain.tools import StructuredTool
 from langchain_core.language_models import BaseLanguageModel
 from langchain_core.runnables import Runnable
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import HumanMessage, ToolMessage
 from pydantic import BaseModel, Field
 
+from app.core.resilience import BudgetExhausted
+
 # Importa o prompt que define a lógica do orquestrador
 from app.prompts.orchestrator_prompts import OrchestratorPrompt
 # Importa as novas ferramentas de negócio
@@ -29,28 +31,70 @@ def create_orchestrator_agent_runnable(
 
     # Função adaptadora para a ferramenta de relatório.
     def report_chain_wrapper(user_intent: str, operation_result: str):
-        return report_chain.invoke({
-            "user_intent": user_intent,
-            "operation_result": operation_result
-        })
+        try:
+            return report_chain.invoke({
+                "user_intent": user_intent,
+                "operation_result": operation_result
+            })
+        except BudgetExhausted:
+            # Sem tempo para formatar: devolve o resultado bruto da operação.
+            return operation_result
+
+    async def areport_chain_wrapper(user_intent: str, operation_result: str):
+        try:
+            return await report_chain.ainvoke({
+                "user_intent": user_intent,
+                "operation_result": operation_result
+            })
+        except BudgetExhausted:
+            return operation_result
+
+    # Resposta degradada do agente SQL quando o orçamento do turno acaba.
+    def sql_budget_fallback(state):
+        tool_results = [m for m in (state or {}).get("messages", []) if isinstance(m, ToolMessage)]
+        if tool_results:
+            return f"Resultado bruto da consulta (tempo esgotado antes da interpretação): {tool_results[-1].content}"
+        return "Não foi possível consultar o banco de dados dentro do tempo disponível."
 
     # Função adaptadora para o agente SQL (LangGraph)
     def sql_agent_wrapper(query: str):
-        # O grafo espera um estado com 'messages'
-        result = sql_agent_graph.invoke({"messages": [HumanMessage(content=query)]})
+        # O grafo espera um estado com 'messages'.
+        # Usa stream para guardar o último estado: se o orçamento do turno acabar
+        # no meio do loop ReAct, ainda podemos devolver o resultado SQL já obtido.
+        state = None
+        try:
+            for state in sql_agent_graph.stream(
+                {"messages": [HumanMessage(content=query)]}, stream_mode="values"
+            ):
+                pass
+        except BudgetExhausted:
+            return sql_budget_fallback(state)
         # O resultado é o estado final. A resposta do agente está na última mensagem.
-        return result["messages"][-1].content
+        return state["messages"][-1].content
+
+    async def asql_agent_wrapper(query: str):
+        state = None
+        try:
+            async for state in sql_agent_graph.astream(
+                {"messages": [HumanMessage(content=query)]}, stream_mode="values"
+            ):
+                pass
+        except BudgetExhausted:
+            return sql_budget_fallback(state)
+        return state["messages"][-1].content
 
     # 1. Cria as ferramentas para o Orquestrador.
     sql_tool = Tool(
         name="SQLQueryTool",
         func=sql_agent_wrapper,
+        coroutine=asql_agent_wrapper,
         description="Use for any questions about reading or querying data from the database. Input should be a user's natural language question."
     )
     
     report_tool = StructuredTool(
         name="ReportFormattingTool",
         func=report_chain_wrapper,
+        coroutine=areport_chain_wrapper,
         description="Use at the end to format the final response. This tool requires specific arguments.",
         args_schema=ReportToolInput
     )
@@ -34,6 +34,8 @@ Você é um assistente de comunicação prestativo. Sua única tarefa é pegar o
 >   * **Valor:** `R$ 200,00`
 >   * **Categoria:** `Frota / Veículos Leves` (Classe: Variável)
 
+Se o resultado mencionar um arquivo (identificador `export:...`), mantenha o identificador exatamente como está na resposta: o arquivo completo será enviado ao usuário como documento.
+
 --- 
 
 **DADOS RECEBIDOS PARA O RELATÓRIO:**
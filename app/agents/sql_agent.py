@@ -4,22 +4,35 @@ from langgraph.prebuilt import create_react_agent
 from langchain_core.messages import SystemMessage
 from langchain_community.utilities import SQLDatabase
 from langchain_core.language_models import BaseLanguageModel
+from sqlalchemy.ext.asyncio import AsyncEngine
 
-def create_sql_agent_graph(llm: BaseLanguageModel, db: SQLDatabase):
+from app.tools.sql_tools import ExportSQLQueryTool, StreamingQuerySQLDatabaseTool
+
+def create_sql_agent_graph(llm: BaseLanguageModel, db: SQLDatabase, async_engine: AsyncEngine | None = None):
     """
     Cria um agente SQL usando LangGraph (create_react_agent).
 
     Args:
         llm (BaseLanguageModel): O modelo de linguagem.
         db (SQLDatabase): O banco de dados.
+        async_engine (AsyncEngine | None): Engine assíncrona (asyncpg). Se informada,
+            as ferramentas `sql_db_query` e `sql_db_export` executam as consultas de
+            forma nativamente assíncrona quando o grafo roda via `ainvoke`/`astream`.
 
     Returns:
         CompiledGraph: O grafo do agente SQL.
     """
     
     # 1. Cria o toolkit SQL para obter as ferramentas
+    # A `sql_db_query` padrão é trocada por uma versão que lê o resultado em streaming:
+    # resultados grandes vão para um arquivo e o LLM recebe só um resumo.
     toolkit = SQLDatabaseToolkit(db=db, llm=llm)
-    tools = toolkit.get_tools()
+    tools = [
+        StreamingQuerySQLDatabaseTool(db=db, async_engine=async_engine, description=t.description)
+        if t.name == "sql_db_query" else t
+        for t in toolkit.get_tools()
+    ]
+    tools.append(ExportSQLQueryTool(db=db, async_engine=async_engine))
 
     # 2. Define o System Prompt
     system_message = SystemMessage(content='''
@@ -32,6 +45,9 @@ You have access to tools for interacting with the database.
 Only use the below tools. Only use the information returned by the below tools to construct your final answer.
 You MUST NOT use any markdown formatting in the SQL query itself (e.g., ```sql ... ```).
 The SQL query must be a single, raw string passed to the tool.
+If a query returns too many rows, the tool returns a summary (row count, totals of quantity/amount columns, min/max of the other numeric columns and the first rows) and a file handle (export:...) instead of every row.
+Do not re-run the query to list all rows: answer from the summary and include the file handle in your final answer, so the full file can be sent to the user.
+If the user asks for a spreadsheet, file or export, use sql_db_export with the format they asked for (csv or xlsx).
 ''')
 
     print(f"Criando agente SQL (LangGraph) com o modelo: {llm.name if hasattr(llm, 'name') else 'LLM'}")
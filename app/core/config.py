@@ -19,6 +19,8 @@ if not all(DATABASE_VARS):
 
 # URL do banco de dados para o LangChain SQL Agent (leitura)
 DATABASE_URL = f"postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Mesma base, com o driver assíncrono (asyncpg), para o caminho assíncrono do agente SQL
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
 # --- Configuração da API do Supabase (para escrita) ---
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -34,4 +36,37 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
 # Validação para garantir que pelo menos uma chave de API de LLM foi fornecida
 if not OPENAI_API_KEY and not GOOGLE_API_KEY:
-    raise ValueError("Erro: Nenhuma chave de API de LLM (OPENAI_API_KEY ou GOOGLE_API_KEY) foi definida no .env.")
\ No newline at end of file
+    raise ValueError("Erro: Nenhuma chave de API de LLM (OPENAI_API_KEY ou GOOGLE_API_KEY) foi definida no .env.")
+
+# --- Configuração de Resiliência do LLM ---
+# Orçamento total (em segundos) de um turno de conversa, compartilhado entre o
+# orquestrador, o agente SQL e a chain de relatório.
+LLM_TURN_DEADLINE_SECONDS = float(os.getenv("LLM_TURN_DEADLINE_SECONDS", "45"))
+# Percentil de latência a partir do qual uma requisição duplicada (hedge) é enviada.
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+# Atraso do hedge (em segundos) enquanto ainda não há histórico de latências.
+LLM_HEDGE_INITIAL_DELAY = float(os.getenv("LLM_HEDGE_INITIAL_DELAY", "3.0"))
+
+# --- Configuração de Resultados Grandes e Exportações ---
+# Diretório onde os resultados completos de consultas grandes são salvos (CSV/XLSX).
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+# Acima deste número de linhas, o resultado não vai para o contexto do LLM:
+# o agente recebe um resumo e o identificador do arquivo com o resultado completo.
+SQL_INLINE_MAX_ROWS = int(os.getenv("SQL_INLINE_MAX_ROWS", "50"))
+# Tamanho do bloco de linhas lido de cada vez do cursor do servidor.
+SQL_STREAM_CHUNK_SIZE = int(os.getenv("SQL_STREAM_CHUNK_SIZE", "1000"))
+# Limpeza do EXPORT_DIR (a cada nova exportação): arquivos mais antigos que o
+# prazo são apagados e, acima do tamanho máximo, os mais antigos saem primeiro.
+EXPORT_TTL_HOURS = float(os.getenv("EXPORT_TTL_HOURS", "24"))
+EXPORT_MAX_DIR_MB = float(os.getenv("EXPORT_MAX_DIR_MB", "500"))
+
+# --- Configuração das Sessões (uma por thread_id) ---
+# Arquivo SQLite onde ficam as conversas despejadas da memória.
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "sessions.db")
+# Orçamento de sessões mantidas em memória: acima de qualquer um dos limites, as
+# sessões usadas há mais tempo vão para o SESSION_DB_PATH e são recarregadas na
+# próxima mensagem.
+SESSION_MAX_ACTIVE = int(os.getenv("SESSION_MAX_ACTIVE", "200"))
+SESSION_MAX_MEMORY_MB = float(os.getenv("SESSION_MAX_MEMORY_MB", "256"))
+# Sessões ociosas há mais tempo que isto (em segundos) também são despejadas (0 desativa).
+SESSION_IDLE_SECONDS = float(os.getenv("SESSION_IDLE_SECONDS", "1800"))
@@ -0,0 +1,281 @@
+# app/core/resilience.py
+# Camada de resiliência para as chamadas ao LLM: orçamento de tempo por turno
+# (deadline) propagado para as chamadas aninhadas e requisições "hedged"
+# (duplicadas) quando a primeira demora mais que o percentil de latência observado.
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, Sequence
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+from pydantic import Field
+
+# O deadline é um instante absoluto (time.monotonic). Por ser uma ContextVar, ele é
+# herdado pelas threads do LangChain/LangGraph (que copiam o contexto), de modo que o
+# orquestrador, o agente SQL e a chain de relatório compartilham o mesmo orçamento.
+_turn_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "turn_deadline", default=None
+)
+
+
+def _start_call(fn, *args, **kwargs) -> "tuple[Future, threading.Event]":
+    """
+    Executa `fn` em uma thread própria (com o contexto atual) e retorna o Future
+    e um evento sinalizado quando a chamada de fato começa.
+
+    Cada requisição síncrona ganha sua thread, sem fila: um pool limitado faria o
+    tempo de espera na fila contar como latência do LLM e disparar hedges que só
+    aumentariam a fila. As requisições perdedoras de um hedge (ou abandonadas por
+    BudgetExhausted) não podem ser canceladas e terminam em segundo plano; para
+    que essas threads não se acumulem, a requisição HTTP recebe como timeout o
+    orçamento restante do turno (ver `ResilientChatModel._request_kwargs`).
+    """
+    future: Future = Future()
+    started = threading.Event()
+    ctx = contextvars.copy_context()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        started.set()
+        try:
+            future.set_result(ctx.run(fn, *args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="llm-call", daemon=True).start()
+    return future, started
+
+
+class BudgetExhausted(TimeoutError):
+    """Levantada quando o orçamento de tempo do turno se esgota antes da resposta do LLM."""
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Define o orçamento de tempo para tudo que for executado dentro do bloco.
+
+    Escopos aninhados nunca estendem o prazo do escopo externo: o deadline
+    efetivo é sempre o menor entre os dois.
+
+    Args:
+        seconds (Optional[float]): Tempo disponível em segundos. `None` não altera o orçamento.
+    """
+    if seconds is None:
+        yield
+        return
+
+    deadline = time.monotonic() + seconds
+    current = _turn_deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+
+    token = _turn_deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _turn_deadline.reset(token)
+
+
+def remaining_budget() -> Optional[float]:
+    """Retorna os segundos restantes do turno atual, ou `None` se não houver deadline."""
+    deadline = _turn_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+class LatencyTracker:
+    """Janela deslizante (thread-safe) com as latências das últimas chamadas bem-sucedidas."""
+
+    def __init__(self, window: int = 200):
+        self._samples: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Percentil `q` (0-1) pelo método nearest-rank, ou `None` sem amostras."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, int(round(q * len(samples))) - 1))
+        return samples[index]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+
+class ResilientChatModel(BaseChatModel):
+    """
+    Envolve um chat model (ex: ChatOpenAI) adicionando deadline e hedging.
+
+    - Antes de cada chamada, verifica o orçamento restante do turno e levanta
+      `BudgetExhausted` se ele já acabou ou se esgotar durante a espera.
+    - Se a primeira requisição demorar mais que o percentil `hedge_percentile`
+      das latências recentes, dispara uma requisição duplicada e usa a que
+      responder primeiro.
+    - Erros não disparam hedge: se nenhuma requisição continua pendente, o erro
+      é levantado (as retentativas ficam a cargo do modelo interno).
+    - Com deadline, cada requisição ao modelo interno usa o orçamento restante
+      como timeout HTTP (modelos com `request_timeout`, como o ChatOpenAI), de modo
+      que nenhuma requisição abandonada dure mais que o turno (vezes o número de
+      retentativas do cliente), em vez do timeout padrão do cliente (600 s na OpenAI).
+    """
+
+    inner: BaseChatModel
+    hedge_percentile: float = 0.95
+    # Atraso usado enquanto ainda não há amostras suficientes para o percentil.
+    hedge_initial_delay: float = 3.0
+    hedge_min_delay: float = 0.25
+    min_samples: int = 20
+    max_hedges: int = 1
+    tracker: LatencyTracker = Field(default_factory=LatencyTracker, exclude=True)
+
+    @property
+    def _llm_type(self) -> str:
+        return f"resilient-{self.inner._llm_type}"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        # Reaproveita a formatação de ferramentas do modelo interno, mantendo
+        # este wrapper (e portanto o hedge) no caminho da chamada.
+        bound = self.inner.bind_tools(tools, **kwargs)
+        return self.bind(**bound.kwargs)
+
+    def _hedge_delay(self) -> float:
+        if len(self.tracker) < self.min_samples:
+            return self.hedge_initial_delay
+        return max(self.tracker.percentile(self.hedge_percentile), self.hedge_min_delay)
+
+    def _request_kwargs(self, kwargs: dict, deadline: Optional[float]) -> dict:
+        """Acrescenta o orçamento restante do turno como timeout da requisição ao modelo interno."""
+        if deadline is None or "timeout" in kwargs or "request_timeout" not in type(self.inner).model_fields:
+            return kwargs
+        return {**kwargs, "timeout": max(deadline - time.monotonic(), 0.001)}
+
+    def _timed(self, fn, *args, **kwargs) -> ChatResult:
+        start = time.monotonic()
+        result = fn(*args, **kwargs)
+        self.tracker.record(time.monotonic() - start)
+        return result
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        deadline = _turn_deadline.get()
+        if deadline is not None and time.monotonic() >= deadline:
+            raise BudgetExhausted("Orçamento de tempo do turno esgotado antes da chamada ao LLM.")
+
+        delay = self._hedge_delay()
+        pending = set()
+        hedges = 0
+
+        def launch() -> threading.Event:
+            future, started = _start_call(
+                self._timed, self.inner._generate, messages, stop, **self._request_kwargs(kwargs, deadline)
+            )
+            pending.add(future)
+            return started
+
+        # O relógio do hedge começa quando a requisição principal de fato começa.
+        started = launch()
+        started.wait(None if deadline is None else max(deadline - time.monotonic(), 0))
+        first_start = time.monotonic()
+        while True:
+            now = time.monotonic()
+            timeout = None if deadline is None else deadline - now
+            if hedges < self.max_hedges:
+                hedge_wait = first_start + delay * (hedges + 1) - now
+                timeout = hedge_wait if timeout is None else min(timeout, hedge_wait)
+
+            done, pending = wait(
+                pending,
+                timeout=None if timeout is None else max(timeout, 0),
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                last_error = future.exception()
+            if done and not pending:
+                # Todas as requisições falharam: o erro não é motivo para hedge.
+                raise last_error
+
+            if deadline is not None and time.monotonic() >= deadline:
+                raise BudgetExhausted("Orçamento de tempo do turno esgotado aguardando o LLM.")
+
+            if hedges < self.max_hedges and time.monotonic() >= first_start + delay * (hedges + 1):
+                launch()
+                hedges += 1
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        deadline = _turn_deadline.get()
+        if deadline is not None and time.monotonic() >= deadline:
+            raise BudgetExhausted("Orçamento de tempo do turno esgotado antes da chamada ao LLM.")
+
+        delay = self._hedge_delay()
+        first_start = time.monotonic()
+        pending = set()
+        hedges = 0
+        last_error: Optional[BaseException] = None
+
+        async def timed_call() -> ChatResult:
+            start = time.monotonic()
+            result = await self.inner._agenerate(messages, stop=stop, **self._request_kwargs(kwargs, deadline))
+            self.tracker.record(time.monotonic() - start)
+            return result
+
+        pending.add(asyncio.ensure_future(timed_call()))
+        try:
+            while True:
+                now = time.monotonic()
+                timeout = None if deadline is None else deadline - now
+                if hedges < self.max_hedges:
+                    hedge_wait = first_start + delay * (hedges + 1) - now
+                    timeout = hedge_wait if timeout is None else min(timeout, hedge_wait)
+
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=None if timeout is None else max(timeout, 0),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                if done and not pending:
+                    raise last_error
+
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise BudgetExhausted("Orçamento de tempo do turno esgotado aguardando o LLM.")
+
+                if hedges < self.max_hedges and time.monotonic() >= first_start + delay * (hedges + 1):
+                    pending.add(asyncio.ensure_future(timed_call()))
+                    hedges += 1
+        finally:
+            # No caminho assíncrono as requisições perdedoras podem ser canceladas.
+            for task in pending:
+                task.cancel()
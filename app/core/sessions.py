@@ -0,0 +1,335 @@
+# app/core/sessions.py
+# Gerenciador de sessões (uma por thread_id) em volta do grafo compilado.
+#
+# O estado das conversas ativas fica em memória (InMemorySaver, o checkpointer do
+# grafo). Quando o número de sessões ou a memória passa do orçamento, as sessões
+# usadas há mais tempo (LRU), e que não estão no meio de um turno, são gravadas no
+# armazenamento durável (ex: AsyncSqliteSaver em arquivo) e removidas da memória.
+# Na próxima mensagem da sessão, o estado é recarregado do armazenamento durável.
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import aclosing, asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver, CheckpointTuple
+from langgraph.checkpoint.memory import InMemorySaver
+
+from app.core.resilience import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+
+class _Session:
+    """Estado de controle de uma sessão (não o estado da conversa, que fica no checkpointer)."""
+
+    __slots__ = ("thread_id", "lock", "loaded", "in_flight", "bytes", "turns", "last_used")
+
+    def __init__(self, thread_id: str):
+        self.thread_id = thread_id
+        # Um turno por vez em cada sessão: turnos concorrentes corromperiam o checkpoint.
+        self.lock = asyncio.Lock()
+        self.loaded = False  # O estado está no checkpointer em memória?
+        self.in_flight = 0  # Turnos em execução ou aguardando o lock.
+        self.bytes = 0
+        self.turns = 0
+        self.last_used = time.monotonic()
+
+
+def _thread_config(thread_id: str) -> Dict[str, Any]:
+    return {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+
+
+class SessionManager:
+    """
+    Limita a memória usada pelas conversas de um processo com muitos usuários.
+
+    - Cada sessão guarda em memória só o checkpoint mais recente (o histórico de
+      checkpoints intermediários é compactado ao fim de cada turno).
+    - Acima de `max_sessions` sessões ou de `max_memory_bytes`, ou quando uma
+      sessão fica ociosa por mais de `idle_seconds`, as sessões menos usadas
+      recentemente são despejadas para o armazenamento durável.
+    - Uma sessão despejada é recarregada sob demanda na sua próxima mensagem.
+    - Com `idle_seconds`, uma tarefa periódica despeja as sessões ociosas mesmo
+      sem tráfego. Ela começa com o gerenciador (ou no primeiro turno, se ele for
+      criado fora de um event loop) e é cancelada em `aclose()`.
+
+    Args:
+        graph: Grafo compilado com um `InMemorySaver` como checkpointer.
+        durable (BaseCheckpointSaver): Armazenamento das sessões despejadas.
+        max_sessions (int): Número máximo de sessões em memória.
+        max_memory_bytes (int): Memória máxima (tamanho serializado dos checkpoints).
+        idle_seconds (float): Tempo ocioso após o qual a sessão é despejada (0 desativa).
+        sweep_seconds (Optional[float]): Intervalo da varredura de sessões ociosas
+            (padrão: metade de `idle_seconds`, no máximo 60 s).
+    """
+
+    def __init__(
+        self,
+        graph,
+        durable: BaseCheckpointSaver,
+        max_sessions: int = 200,
+        max_memory_bytes: int = 256 * 1024 * 1024,
+        idle_seconds: float = 0,
+        sweep_seconds: Optional[float] = None,
+    ):
+        if not isinstance(graph.checkpointer, InMemorySaver):
+            raise ValueError("O SessionManager requer um grafo compilado com InMemorySaver como checkpointer.")
+        self.graph = graph
+        self.memory: InMemorySaver = graph.checkpointer
+        self.durable = durable
+        self.max_sessions = max_sessions
+        self.max_memory_bytes = max_memory_bytes
+        self.idle_seconds = idle_seconds
+        self.sweep_seconds = sweep_seconds if sweep_seconds is not None else min(60.0, idle_seconds / 2)
+
+        # Ordem LRU: a sessão usada há mais tempo fica no início.
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._budget_lock = asyncio.Lock()
+        self.evictions = 0
+        self.rehydrations = 0
+        self.rehydration_latency = LatencyTracker(window=500)
+        self._sweeper: Optional[asyncio.Task] = None
+        self._closed = False
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass  # Sem event loop: a varredura começa no primeiro turno.
+        else:
+            self._start_sweeper()
+
+    async def __aenter__(self) -> "SessionManager":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    # --- Execução de turnos ---
+
+    async def astream(self, thread_id: str, inputs: Dict[str, Any], config: Optional[Dict[str, Any]] = None,
+                      stream_mode: str = "values") -> AsyncIterator[Any]:
+        """
+        Executa um turno da sessão `thread_id` (equivale a `graph.astream`).
+
+        A sessão só é liberada quando o gerador termina ou é fechado (`aclose()`).
+        Se o consumo puder ser interrompido no meio (ex: `break`), prefira `stream()`,
+        que fecha o gerador ao sair do bloco.
+        """
+        config = dict(config or {})
+        config["configurable"] = {**config.get("configurable", {}), "thread_id": thread_id}
+
+        self._start_sweeper()
+        session = await self._acquire(thread_id)
+        try:
+            async with aclosing(self.graph.astream(inputs, config, stream_mode=stream_mode)) as events:
+                async for event in events:
+                    yield event
+        finally:
+            await self._release(session)
+        await self.enforce_budget()
+
+    @asynccontextmanager
+    async def stream(self, thread_id: str, inputs: Dict[str, Any], config: Optional[Dict[str, Any]] = None,
+                     stream_mode: str = "values") -> AsyncIterator[AsyncIterator[Any]]:
+        """
+        Versão de `astream` como gerenciador de contexto: ao sair do bloco (mesmo
+        com `break` ou exceção) o turno é encerrado e a sessão liberada.
+
+            async with sessions.stream(thread_id, inputs) as events:
+                async for event in events:
+                    ...
+        """
+        async with aclosing(self.astream(thread_id, inputs, config, stream_mode)) as events:
+            yield events
+
+    async def ainvoke(self, thread_id: str, inputs: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> Any:
+        """Executa um turno e retorna o estado final."""
+        state = None
+        async for state in self.astream(thread_id, inputs, config):
+            pass
+        return state
+
+    async def _acquire(self, thread_id: str) -> _Session:
+        session = self._sessions.get(thread_id)
+        if session is None:
+            session = self._sessions[thread_id] = _Session(thread_id)
+        self._sessions.move_to_end(thread_id)
+        session.in_flight += 1
+        try:
+            await session.lock.acquire()
+        except BaseException:
+            session.in_flight -= 1
+            raise
+        try:
+            if not session.loaded:
+                await self._rehydrate(session)
+        except BaseException:
+            session.in_flight -= 1
+            session.lock.release()
+            raise
+        return session
+
+    async def _release(self, session: _Session) -> None:
+        try:
+            session.bytes = await self._compact(session.thread_id)
+            session.turns += 1
+        finally:
+            session.last_used = time.monotonic()
+            session.in_flight -= 1
+            session.lock.release()
+
+    # --- Movimentação entre memória e armazenamento durável ---
+
+    @staticmethod
+    async def _copy_checkpoint(saved: CheckpointTuple, target: BaseCheckpointSaver) -> None:
+        """Grava o checkpoint (e as escritas pendentes, se houver) em outro checkpointer."""
+        checkpoint = saved.checkpoint
+        config = await target.aput(
+            _thread_config(saved.config["configurable"]["thread_id"]),
+            checkpoint,
+            saved.metadata,
+            checkpoint["channel_versions"],
+        )
+        writes_by_task: Dict[str, List[tuple]] = {}
+        for task_id, channel, value in saved.pending_writes or []:
+            writes_by_task.setdefault(task_id, []).append((channel, value))
+        for task_id, writes in writes_by_task.items():
+            await target.aput_writes(config, writes, task_id)
+
+    async def _compact(self, thread_id: str) -> int:
+        """
+        Mantém em memória só o checkpoint mais recente da sessão.
+
+        Returns:
+            int: Tamanho serializado do estado da sessão, em bytes.
+        """
+        latest = await self.memory.aget_tuple(_thread_config(thread_id))
+        if latest is None:
+            return 0
+        await self.memory.adelete_thread(thread_id)
+        await self._copy_checkpoint(latest, self.memory)
+        return len(self.memory.serde.dumps_typed(latest.checkpoint)[1])
+
+    async def _rehydrate(self, session: _Session) -> None:
+        started = time.perf_counter()
+        saved = await self.durable.aget_tuple(_thread_config(session.thread_id))
+        if saved is not None:
+            await self._copy_checkpoint(saved, self.memory)
+            session.bytes = len(self.memory.serde.dumps_typed(saved.checkpoint)[1])
+            self.rehydrations += 1
+            self.rehydration_latency.record(time.perf_counter() - started)
+        session.loaded = True
+
+    async def evict(self, thread_id: str) -> bool:
+        """Grava a sessão no armazenamento durável e a remove da memória. Retorna False se ela estiver em uso."""
+        session = self._sessions.get(thread_id)
+        if session is None or session.in_flight or session.lock.locked():
+            return False
+        async with session.lock:
+            if session.loaded:
+                latest = await self.memory.aget_tuple(_thread_config(thread_id))
+                if latest is not None:
+                    # O armazenamento durável guarda só o estado mais recente de cada sessão.
+                    await self.durable.adelete_thread(thread_id)
+                    await self._copy_checkpoint(latest, self.durable)
+                await self.memory.adelete_thread(thread_id)
+                session.loaded = False
+                session.bytes = 0
+                self.evictions += 1
+        # Se uma mensagem chegou durante o despejo, a sessão continua registrada e
+        # será recarregada por ela.
+        if session.in_flight == 0 and self._sessions.get(thread_id) is session:
+            del self._sessions[thread_id]
+        return True
+
+    async def enforce_budget(self) -> None:
+        """Despeja sessões (LRU) até respeitar o orçamento de sessões e de memória."""
+        if self._budget_lock.locked():
+            return  # Outro turno já está despejando.
+        async with self._budget_lock:
+            now = time.monotonic()
+            for session in list(self._sessions.values()):
+                over_budget = (
+                    self.sessions_in_memory > self.max_sessions
+                    or self.memory_bytes > self.max_memory_bytes
+                )
+                idle = self.idle_seconds and now - session.last_used > self.idle_seconds
+                if not over_budget and not idle:
+                    break  # As próximas foram usadas mais recentemente.
+                if session.loaded and not session.in_flight:
+                    await self.evict(session.thread_id)
+
+    def _start_sweeper(self) -> None:
+        if self._sweeper is None and not self._closed and self.idle_seconds > 0:
+            self._sweeper = asyncio.create_task(self._sweep(), name="session-sweeper")
+
+    async def _sweep(self) -> None:
+        """Despeja periodicamente as sessões ociosas, mesmo quando não há turnos terminando."""
+        while True:
+            await asyncio.sleep(self.sweep_seconds)
+            try:
+                await self.enforce_budget()
+            except Exception as e:
+                logger.warning(f"Falha ao despejar sessões ociosas: {e}")
+
+    async def aclose(self) -> None:
+        """
+        Para a varredura periódica e grava todas as sessões ociosas no
+        armazenamento durável (ex: ao encerrar o processo).
+        """
+        self._closed = True
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+        for thread_id in list(self._sessions):
+            await self.evict(thread_id)
+
+    # --- Métricas ---
+
+    @property
+    def sessions_in_memory(self) -> int:
+        return sum(1 for s in self._sessions.values() if s.loaded)
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(s.bytes for s in self._sessions.values() if s.loaded)
+
+    def session_stats(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """Métricas de uma sessão registrada (None se ela não está em memória)."""
+        session = self._sessions.get(thread_id)
+        if session is None:
+            return None
+        return {
+            "in_memory": session.loaded,
+            "bytes": session.bytes,
+            "turns": session.turns,
+            "in_flight": session.in_flight,
+            "idle_seconds": round(time.monotonic() - session.last_used, 1),
+        }
+
+    def stats(self, top: int = 5) -> Dict[str, Any]:
+        """Métricas agregadas: ocupação, orçamento, despejos e latência de recarga."""
+        loaded = [s for s in self._sessions.values() if s.loaded]
+        largest = sorted(loaded, key=lambda s: s.bytes, reverse=True)[:top]
+
+        def ms(q: float) -> Optional[float]:
+            value = self.rehydration_latency.percentile(q)
+            return round(value * 1000, 2) if value is not None else None
+
+        return {
+            "sessions_in_memory": len(loaded),
+            "sessions_in_flight": sum(1 for s in self._sessions.values() if s.in_flight),
+            "memory_bytes": sum(s.bytes for s in loaded),
+            "max_sessions": self.max_sessions,
+            "max_memory_bytes": self.max_memory_bytes,
+            "largest_sessions": {s.thread_id: s.bytes for s in largest},
+            "evictions": self.evictions,
+            "rehydrations": self.rehydrations,
+            "rehydration_ms": {"p50": ms(0.50), "p95": ms(0.95), "max": ms(1.0)},
+        }
@@ -4,12 +4,13 @@ from typing import Annotated, Sequence
 import json
 
 from langchain_core.agents import AgentFinish
-from langchain_core.messages import BaseMessage, AIMessage
+from langchain_core.messages import BaseMessage, AIMessage, ToolMessage
 from langchain_core.tools import Tool
-from langchain_core.runnables import Runnable
+from langchain_core.runnables import Runnable, RunnableLambda
 from langgraph.graph import END, StateGraph
 from langgraph.prebuilt import ToolNode
 
+from app.core.resilience import BudgetExhausted
 from .state import GraphState
 
 
@@ -21,10 +22,33 @@ def should_continue(state: GraphState) -> str:
         return END
     return "tools"
 
+def budget_exhausted_reply(state: GraphState) -> str:
+    """Resposta degradada quando o orçamento do turno acaba: o último resultado de ferramenta, sem formatação."""
+    for message in reversed(state["messages"]):
+        if isinstance(message, ToolMessage):
+            return f"⏱️ Não consegui formatar a resposta a tempo. Resultado obtido:\n{message.content}"
+        if not isinstance(message, AIMessage):
+            break
+    return "⏱️ O assistente demorou mais que o esperado para responder. Por favor, tente novamente."
+
 def agent_node(state: GraphState, agent: Runnable, name: str):
     """Executa o nó do agente e retorna a resposta como uma mensagem AI."""
-    result = agent.invoke(state)
-    
+    try:
+        result = agent.invoke(state)
+    except BudgetExhausted:
+        return {"messages": [AIMessage(content=budget_exhausted_reply(state))]}
+    return agent_result_to_state(result)
+
+async def aagent_node(state: GraphState, agent: Runnable, name: str):
+    """Versão assíncrona de agent_node, usada quando o grafo roda via ainvoke/astream."""
+    try:
+        result = await agent.ainvoke(state)
+    except BudgetExhausted:
+        return {"messages": [AIMessage(content=budget_exhausted_reply(state))]}
+    return agent_result_to_state(result)
+
+def agent_result_to_state(result):
+    """Converte a saída do agente (AgentFinish ou ações) em uma atualização de estado."""
     if isinstance(result, AgentFinish):
         content = result.return_values.get("output", "") 
         return {"messages": [AIMessage(content=content)]}
@@ -55,8 +79,16 @@ def create_graph_with_persistence(agent_runnable: Runnable, tools: Sequence[Tool
     """
     workflow = StateGraph(GraphState)
 
-    workflow.add_node("agent", lambda state: agent_node(state, agent_runnable, "agent"))
+    # O nó do agente suporta os dois modos de execução: `stream`/`invoke` usam a
+    # versão síncrona e `astream`/`ainvoke` a assíncrona.
+    workflow.add_node("agent", RunnableLambda(
+        lambda state: agent_node(state, agent_runnable, "agent"),
+        afunc=lambda state: aagent_node(state, agent_runnable, "agent"),
+        name="agent",
+    ))
 
+    # No modo assíncrono, o ToolNode executa as chamadas de ferramenta de um mesmo
+    # passo concorrentemente no event loop (asyncio.gather).
     tool_node = ToolNode(tools)
     workflow.add_node("tools", tool_node)
 
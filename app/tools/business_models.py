@@ -0,0 +1,68 @@
+# app/tools/business_models.py
+# Modelos de dados de negócio (validação automática dos registros de custos,
+# vendas e abates). Módulo sem efeitos colaterais na importação (não lê o .env nem
+# cria clientes), para que a importação em massa e os scripts possam usá-lo
+# sem a configuração completa da aplicação.
+from decimal import Decimal
+from pydantic import BaseModel, Field
+from typing import Optional, Literal
+
+# --- Modelos de Dados de Negócio (Validação Automática) ---
+class CustoInput(BaseModel):
+    """Modelo para registrar um novo custo. Espelha a estrutura da tabela 'custos'."""
+    data: str = Field(description="Data do custo no formato AAAA-MM-DD")
+    descricao: str = Field(description="Descrição detalhada do que foi o custo")
+    total: float = Field(description="O valor total do custo. Este campo é obrigatório.")
+    
+    # Mapeamento para as colunas reais e opcionais do banco de dados
+    classe: str | None = Field(None, description="A classe do custo, ex: 'custo operacional'")
+    categoria: str | None = Field(None, description="A categoria principal do custo, ex: 'Transporte'")
+    sub_categoria: str | None = Field(None, description="A subcategoria específica, ex: 'combustivel'")
+    quantidade: float | None = Field(None, description="A quantidade de itens, se aplicável")
+    preco_unitario: float | None = Field(None, description="O preço por unidade, se aplicável")
+    beneficiario: str | None = Field(None, description="Para quem ou onde o pagamento foi feito")
+    forma_pagamento: str | None = Field(None, description="Método de pagamento, ex: 'Dinheiro', 'Pix'")
+    lote: str | None = Field(None, description="Lote associado ao custo, se houver")
+    observacoes: str | None = Field(None, description="Qualquer observação adicional")
+
+class VendaInput(BaseModel):
+    """Modelo para registrar uma nova venda. Espelha a estrutura da tabela 'vendas'."""
+
+    # Campos obrigatórios (NOT NULL)
+    data: str = Field(description="Data da venda no formato AAAA-MM-DD")
+    cliente: str = Field(description="Nome ou identificação do cliente")
+    estabelecimento: str = Field(
+        "", description="Nome ou código do estabelecimento onde a venda ocorreu (use '' se não houver)"
+    )
+    produto: Literal["Caranha", "Pintado"] = Field(description="Produto vendido: 'Caranha' ou 'Pintado'")
+    tipo_produto: Literal["cortado", "cortada", "inteiro", "inteira", "cabeça", "retalho"] = Field(
+        description="Tipo do produto: 'cortado/a', 'inteiro/a', 'cabeça' ou 'retalho'"
+    )
+    quantidade_kg: float = Field(description="Quantidade vendida em quilogramas (> 0)")
+    preco_por_kg: float = Field(description="Preço unitário por quilograma (> 0)")
+    total: float = Field(description="Valor total da venda (quantidade_kg * preco_por_kg)")
+    status_venda: Literal["pago", "doacao", "pendente"] = Field(
+        description="Situação da venda: 'pago', 'doacao' ou 'pendente'"
+    )
+    lote: str = Field(description="Identificação do lote ao qual a venda está vinculada")
+
+    # Campos opcionais
+    forma_pagamento: Optional[str] = Field(
+        None, description="Método de pagamento (ex.: 'Dinheiro', 'Pix', 'Cartão débito')"
+    )
+    observacao: Optional[str] = Field(None, description="Observação livre sobre a venda")
+
+class AbateInput(BaseModel):
+    """Modelo para registrar um novo abate. Espelha a estrutura da tabela 'abates'."""
+
+    # Campos obrigatórios (NOT NULL)
+    data: str = Field(description="Data do abate no formato AAAA-MM-DD")
+    especie: str = Field(description="Espécie do peixe abatido")
+    lote: str = Field(description="Código do lote associado ao abate")
+    quantidade_peixes: int = Field(description="Número de peixes abatidos (deve ser > 0)")
+    quantidade_kg: Decimal = Field(description="Peso total abatido em kg (deve ser > 0)")
+    tanque_gaiola: str = Field(description="Tanque ou gaiola onde ocorreu o abate")
+    peso_medio: Decimal = Field(description="Peso médio por peixe (kg, deve ser > 0)")
+
+    # Campo opcional
+    observacao: str | None = Field(None, description="Observação livre sobre o abate")
@@ -0,0 +1,201 @@
+# app/tools/export_tools.py
+# Escrita incremental de resultados de consultas em arquivos (CSV/XLSX) que podem
+# ser enviados ao usuário como documento, e resolução dos identificadores
+# (`export:<arquivo>`) devolvidos ao agente.
+
+import csv
+import logging
+import os
+import re
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence
+
+from app.core.config import EXPORT_DIR, EXPORT_MAX_DIR_MB, EXPORT_TTL_HOURS
+
+logger = logging.getLogger(__name__)
+
+EXPORT_HANDLE_PREFIX = "export:"
+
+MIME_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Nome de arquivo gerado por ExportWriter: sem separadores de diretório.
+_HANDLE_RE = re.compile(rf"{EXPORT_HANDLE_PREFIX}([\w.-]+\.(?:csv|xlsx))")
+_FILENAME_RE = re.compile(r"[\w.-]+\.(?:csv|xlsx)")
+
+
+class ExportError(ValueError):
+    """Levantada quando não é possível gerar o arquivo (formato inválido ou openpyxl ausente)."""
+
+
+class ExportWriter:
+    """
+    Escreve linhas em um arquivo CSV ou XLSX à medida que chegam do banco.
+
+    Nada além do bloco atual fica em memória: o CSV é escrito direto no disco e
+    o XLSX usa o modo `write_only` do openpyxl, que também grava em streaming.
+    Ao fechar o arquivo, as exportações antigas são limpas (`cleanup_exports`).
+    """
+
+    def __init__(self, columns: Sequence[str], fmt: str = "csv", export_dir: str = EXPORT_DIR, prefix: str = "consulta"):
+        if fmt not in MIME_TYPES:
+            raise ExportError(f"Formato de exportação não suportado: {fmt}. Use 'csv' ou 'xlsx'.")
+
+        self.fmt = fmt
+        self.export_dir = export_dir
+        self.row_count = 0
+        self.filename = f"{prefix}_{datetime.now():%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:8]}.{fmt}"
+        os.makedirs(export_dir, exist_ok=True)
+        self.path = Path(export_dir) / self.filename
+
+        if fmt == "csv":
+            # utf-8-sig para o Excel abrir os acentos corretamente.
+            self._file = open(self.path, "w", newline="", encoding="utf-8-sig")
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(columns)
+        else:
+            # Importado aqui para que só a exportação em XLSX dependa do openpyxl.
+            try:
+                from openpyxl import Workbook
+            except ImportError as e:
+                raise ExportError("Exportação em XLSX requer o pacote 'openpyxl'. Use o formato 'csv'.") from e
+            self._workbook = Workbook(write_only=True)
+            self._sheet = self._workbook.create_sheet("Resultado")
+            self._sheet.append(list(columns))
+
+    @property
+    def handle(self) -> str:
+        """Identificador do arquivo devolvido ao agente (e resolvido por `resolve_export`)."""
+        return f"{EXPORT_HANDLE_PREFIX}{self.filename}"
+
+    def write_rows(self, rows: Iterable[Sequence]) -> None:
+        if self.fmt == "csv":
+            for row in rows:
+                self._csv.writerow(row)
+                self.row_count += 1
+        else:
+            for row in rows:
+                self._sheet.append([_xlsx_value(v) for v in row])
+                self.row_count += 1
+
+    def close(self) -> Path:
+        """Finaliza o arquivo e retorna o seu caminho."""
+        if self.fmt == "csv":
+            self._file.close()
+        else:
+            self._workbook.save(self.path)
+        cleanup_exports(self.export_dir, keep=self.path)
+        return self.path
+
+    def abort(self) -> None:
+        """Descarta um arquivo parcial (ex: a consulta falhou no meio do streaming)."""
+        try:
+            if self.fmt == "csv":
+                self._file.close()
+        finally:
+            self.path.unlink(missing_ok=True)
+
+
+def _xlsx_value(value):
+    # O openpyxl aceita números, textos e datas (sem fuso horário); o resto vira texto.
+    if value is None or isinstance(value, (str, int, float, Decimal, date, time)):
+        if isinstance(value, (datetime, time)) and value.tzinfo is not None:
+            return value.replace(tzinfo=None)
+        return value
+    return str(value)
+
+
+def cleanup_exports(
+    export_dir: str = EXPORT_DIR,
+    ttl_seconds: float = EXPORT_TTL_HOURS * 3600,
+    max_bytes: int = int(EXPORT_MAX_DIR_MB * 1024 * 1024),
+    keep: Optional[Path] = None,
+) -> int:
+    """
+    Apaga as exportações expiradas e, se o diretório passar de `max_bytes`, as
+    mais antigas até voltar ao limite. Só arquivos com nome de exportação
+    (`*.csv`/`*.xlsx`) são considerados.
+
+    Args:
+        export_dir (str): Diretório das exportações.
+        ttl_seconds (float): Idade máxima de um arquivo (0 desativa).
+        max_bytes (int): Tamanho máximo do diretório (0 desativa).
+        keep (Optional[Path]): Arquivo que nunca é apagado (ex: o que acabou de ser gerado).
+
+    Returns:
+        int: Quantos arquivos foram apagados.
+    """
+    files = []
+    try:
+        with os.scandir(export_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or not _FILENAME_RE.fullmatch(entry.name):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # Apagado por outro processo.
+                files.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+    except FileNotFoundError:
+        return 0
+
+    keep_name = keep.name if keep is not None else None
+    now = datetime.now().timestamp()
+    total = sum(size for _, size, _ in files)
+    removed = 0
+    for mtime, size, path in sorted(files, key=lambda f: f[0]):
+        expired = ttl_seconds > 0 and now - mtime > ttl_seconds
+        over_size = max_bytes > 0 and total > max_bytes
+        if path.name == keep_name or not (expired or over_size):
+            continue
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Não foi possível apagar a exportação {path}: {e}")
+            continue
+        total -= size
+        removed += 1
+    if removed:
+        logger.info(f"{removed} exportações antigas apagadas de {export_dir}.")
+    return removed
+
+
+def find_export_handles(text: str) -> List[str]:
+    """
+    Encontra os identificadores de arquivos exportados em uma resposta do agente.
+
+    Usado pela integração de mensagens para anexar os arquivos como documento.
+    """
+    return [f"{EXPORT_HANDLE_PREFIX}{name}" for name in dict.fromkeys(_HANDLE_RE.findall(text or ""))]
+
+
+def resolve_export(handle: str, export_dir: str = EXPORT_DIR) -> Path:
+    """
+    Converte um identificador `export:<arquivo>` no caminho do arquivo.
+
+    Args:
+        handle (str): Identificador devolvido pelas ferramentas SQL.
+        export_dir (str): Diretório das exportações.
+
+    Returns:
+        Path: Caminho do arquivo exportado.
+    """
+    match = _HANDLE_RE.fullmatch(handle.strip())
+    if not match:
+        raise ValueError(f"Identificador de exportação inválido: {handle}")
+    path = Path(export_dir) / match.group(1)
+    if not path.is_file():
+        raise FileNotFoundError(f"Arquivo de exportação não encontrado: {path}")
+    return path
+
+
+def export_mime_type(path: Path) -> str:
+    """Tipo MIME do arquivo exportado, para o envio como documento."""
+    return MIME_TYPES[Path(path).suffix.lstrip(".")]
@@ -0,0 +1,541 @@
+# app/tools/import_tools.py
+# Importação em massa de planilhas históricas (CSV/XLSX) para custos, vendas e abates.
+#
+# Fluxo: a planilha é lida em streaming, em lotes. Cada lote tem as colunas
+# normalizadas (datas, números com o separador decimal da planilha, textos)
+# coluna a coluna e é validado de uma vez contra CustoInput / VendaInput /
+# AbateInput. As linhas válidas vão para uma tabela de staging via COPY
+# (Postgres). No fim, um único INSERT ... SELECT move para a tabela final o que
+# ainda não existe nela (deduplicação), tudo na mesma transação. As linhas
+# inválidas vão para um arquivo de rejeitados, com o número da linha e o motivo.
+
+import csv
+import io
+import re
+import time
+import unicodedata
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache, partial
+from operator import attrgetter
+from itertools import islice, zip_longest
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional, Sequence, Tuple, Type, get_args, get_origin
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from .business_models import AbateInput, CustoInput, VendaInput
+
+MODELS: Dict[str, Type[BaseModel]] = {
+    "custos": CustoInput,
+    "vendas": VendaInput,
+    "abates": AbateInput,
+}
+
+# Colunas que identificam um registro: uma linha cujo valor nessas colunas já
+# existe na tabela (ou aparece antes no mesmo arquivo) é considerada duplicada.
+DEDUPE_KEYS: Dict[str, Tuple[str, ...]] = {
+    "custos": ("data", "descricao", "total"),
+    "vendas": ("data", "cliente", "produto", "tipo_produto", "quantidade_kg", "total", "lote"),
+    "abates": ("data", "lote", "tanque_gaiola", "quantidade_peixes", "quantidade_kg"),
+}
+
+# Campos que precisam ser maiores que zero (ver as descrições dos modelos).
+POSITIVE_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "custos": (),
+    "vendas": ("quantidade_kg", "preco_por_kg"),
+    "abates": ("quantidade_peixes", "quantidade_kg", "peso_medio"),
+}
+
+# Nomes de coluna comuns nas planilhas (já normalizados) -> campo do modelo.
+COLUMN_ALIASES: Dict[str, Dict[str, str]] = {
+    "custos": {
+        "valor": "total", "valor_total": "total", "subcategoria": "sub_categoria",
+        "qtd": "quantidade", "preco": "preco_unitario", "valor_unitario": "preco_unitario",
+        "fornecedor": "beneficiario", "pagamento": "forma_pagamento",
+        "obs": "observacoes", "observacao": "observacoes",
+    },
+    "vendas": {
+        "valor": "total", "valor_total": "total", "kg": "quantidade_kg", "quantidade": "quantidade_kg",
+        "preco": "preco_por_kg", "preco_kg": "preco_por_kg", "status": "status_venda",
+        "tipo": "tipo_produto", "pagamento": "forma_pagamento", "obs": "observacao",
+        "observacoes": "observacao",
+    },
+    "abates": {
+        "peixes": "quantidade_peixes", "qtd_peixes": "quantidade_peixes", "kg": "quantidade_kg",
+        "peso_total": "quantidade_kg", "tanque": "tanque_gaiola", "gaiola": "tanque_gaiola",
+        "peso_medio_kg": "peso_medio", "obs": "observacao", "observacoes": "observacao",
+    },
+}
+
+# Coluna auxiliar da staging: número da linha na planilha (mantém a primeira ocorrência).
+_LINE_COLUMN = "_linha"
+
+
+@dataclass
+class ImportReport:
+    """Progresso e resultado de uma importação."""
+    table: str
+    source: str
+    rows_read: int = 0
+    rows_valid: int = 0
+    rows_rejected: int = 0
+    rows_inserted: int = 0
+    rows_duplicated: int = 0
+    seconds: float = 0.0
+    reject_file: Optional[str] = None
+    unmapped_columns: List[str] = field(default_factory=list)
+    dry_run: bool = False
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_read / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "rows_per_second": round(self.rows_per_second, 1)}
+
+
+class _Invalid:
+    """Valor que não pôde ser convertido na normalização da coluna."""
+    __slots__ = ("message",)
+
+    def __init__(self, message: str):
+        self.message = message
+
+
+# --- Leitura da planilha ---
+
+def _normalize_header(name: Any) -> str:
+    text_ = unicodedata.normalize("NFKD", str(name or "")).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "_", text_.lower()).strip("_")
+
+
+def _read_csv(path: Path, delimiter: Optional[str], encoding: str) -> Iterator[Sequence]:
+    with open(path, newline="", encoding=encoding) as f:
+        if delimiter is None:
+            # Planilhas exportadas no Brasil costumam usar ';'.
+            sample = f.read(64 * 1024)
+            f.seek(0)
+            try:
+                delimiter = csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+            except csv.Error:
+                delimiter = ","
+        yield from csv.reader(f, delimiter=delimiter)
+
+
+def _read_xlsx(path: Path, sheet: Optional[str]) -> Iterator[Sequence]:
+    # Dependência opcional: só é necessária para importar XLSX.
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise ValueError("Importação de XLSX requer o pacote 'openpyxl'. Exporte a planilha como CSV.") from e
+    # read_only: as linhas são lidas sob demanda, sem carregar a planilha inteira.
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.active
+        yield from worksheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def read_spreadsheet(path: str | Path, sheet: Optional[str] = None, delimiter: Optional[str] = None,
+                     encoding: str = "utf-8-sig") -> Tuple[List[Any], Iterator[Sequence]]:
+    """
+    Abre um CSV ou XLSX para leitura em streaming.
+
+    Returns:
+        Tuple[List[Any], Iterator[Sequence]]: O cabeçalho e um gerador das linhas de dados
+            (feche-o com `close()` se a leitura for interrompida).
+    """
+    path = Path(path)
+    if path.suffix.lower() in (".xlsx", ".xlsm"):
+        rows = _read_xlsx(path, sheet)
+    else:
+        rows = _read_csv(path, delimiter, encoding)
+    header = list(next(rows, []))
+    return header, rows
+
+
+def map_columns(table: str, header: Sequence[Any], overrides: Optional[Dict[str, str]] = None) -> Tuple[Dict[int, str], List[str]]:
+    """
+    Associa as colunas da planilha aos campos do modelo da tabela.
+
+    Args:
+        table (str): 'custos', 'vendas' ou 'abates'.
+        header (Sequence[Any]): Cabeçalho da planilha.
+        overrides (Optional[Dict[str, str]]): Mapeamento explícito {coluna da planilha: campo}.
+
+    Returns:
+        Tuple[Dict[int, str], List[str]]: {índice da coluna: campo} e as colunas ignoradas.
+    """
+    model = MODELS[table]
+    fields = model.model_fields
+    aliases = {**COLUMN_ALIASES[table]}
+    for column, field_name in (overrides or {}).items():
+        if field_name not in fields:
+            raise ValueError(f"Campo '{field_name}' não existe em {model.__name__}.")
+        aliases[_normalize_header(column)] = field_name
+
+    mapping: Dict[int, str] = {}
+    unmapped: List[str] = []
+    for index, column in enumerate(header):
+        name = _normalize_header(column)
+        field_name = aliases.get(name, name)
+        if field_name in fields and field_name not in mapping.values():
+            mapping[index] = field_name
+        elif column not in (None, ""):
+            unmapped.append(str(column))
+
+    missing = [
+        name for name, info in fields.items()
+        if info.is_required() and name not in mapping.values()
+    ]
+    if missing:
+        raise ValueError(
+            f"Colunas obrigatórias ausentes para '{table}': {', '.join(missing)}. "
+            f"Use o mapeamento de colunas (coluna=campo) se os nomes forem diferentes."
+        )
+    return mapping, unmapped
+
+
+# --- Normalização por coluna ---
+
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_DATE_FORMATS = ("%d/%m/%Y", "%d/%m/%y", "%d-%m-%Y", "%Y/%m/%d")
+
+
+_BR_DATE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+
+
+# Uma planilha de anos de histórico tem poucos milhares de datas distintas.
+@lru_cache(maxsize=8192)
+def _to_date(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    s = str(value).strip()
+    try:
+        if _ISO_DATE.match(s):
+            return date.fromisoformat(s[:10]).isoformat()
+        match = _BR_DATE.fullmatch(s)
+        if match:
+            day, month, year = match.groups()
+            return date(int(year), int(month), int(day)).isoformat()
+    except ValueError:
+        return _Invalid(f"data inválida: {s!r}")
+    for fmt in _DATE_FORMATS[1:]:
+        try:
+            return datetime.strptime(s, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return _Invalid(f"data inválida: {s!r}")
+
+
+# Separadores decimais aceitos: ',' (formato brasileiro, o padrão) ou '.'.
+DECIMAL_SEPARATORS = (",", ".")
+
+# Parte inteira agrupada por milhar: 1.234.567 (com vírgula decimal) ou 1,234,567 (com ponto).
+_THOUSANDS_GROUPS = {
+    ",": re.compile(r"-?\d{1,3}(?:\.\d{3})+"),
+    ".": re.compile(r"-?\d{1,3}(?:,\d{3})+"),
+}
+
+
+def _to_number(value: Any, decimal: str = ",") -> Any:
+    if isinstance(value, (int, float, Decimal)):
+        return value
+    s = str(value).replace("R$", "").replace("\xa0", "").replace(" ", "")
+    thousands = "." if decimal == "," else ","
+    integer, separator, fraction = s.partition(decimal)
+    if thousands in fraction:
+        # 1,234.56 numa planilha com vírgula decimal (ou 1.234,56 com ponto decimal).
+        return _Invalid(f"número em formato ambíguo: {value!r} (separador decimal {decimal!r})")
+    if _THOUSANDS_GROUPS[decimal].fullmatch(integer):
+        if not separator:
+            # "450.500" pode ser 450500 ou 450,5 kg (ponto decimal com 3 casas).
+            return _Invalid(f"número em formato ambíguo: {value!r} (separador decimal {decimal!r})")
+        integer = integer.replace(thousands, "")
+    # A conversão para float/int/Decimal (e o erro, se houver) fica com o pydantic.
+    return f"{integer}.{fraction}" if separator else integer
+
+
+def _to_text(value: Any) -> Any:
+    if value.__class__ is str:
+        return value.strip()
+    if isinstance(value, float) and value.is_integer():
+        # Códigos numéricos lidos do XLSX (ex: lote 12.0).
+        return str(int(value))
+    return str(value).strip()
+
+
+def _literal_converter(options: Sequence[str]) -> Callable[[Any], Any]:
+    # Aceita variações de maiúsculas/minúsculas ('Pago', 'PINTADO').
+    canonical = {str(option).lower(): option for option in options}
+
+    @lru_cache(maxsize=1024)
+    def convert(value: Any) -> Any:
+        return canonical.get(str(value).strip().lower(), str(value).strip())
+    return convert
+
+
+def _field_converter(name: str, annotation: Any, decimal: str = ",") -> Callable[[Any], Any]:
+    # Desembrulha Optional[...] / X | None.
+    args = [a for a in get_args(annotation) if a is not type(None)]
+    if get_origin(annotation) is not Literal and len(args) == 1:
+        annotation = args[0]
+
+    if name == "data":
+        return _to_date
+    if get_origin(annotation) is Literal:
+        return _literal_converter(get_args(annotation))
+    if annotation in (int, float, Decimal):
+        return partial(_to_number, decimal=decimal)
+    return _to_text
+
+
+class _BatchValidator:
+    """Normaliza e valida lotes de linhas contra o modelo da tabela."""
+
+    def __init__(self, table: str, mapping: Dict[int, str], decimal: str = ","):
+        self.model = MODELS[table]
+        self.mapping = mapping
+        # Todos os campos do modelo são gravados: os que não vieram da planilha
+        # recebem o padrão do modelo (ex: estabelecimento = "") via model_dump.
+        self.columns = list(self.model.model_fields)
+        self.converters = {
+            name: _field_converter(name, info.annotation, decimal)
+            for name, info in self.model.model_fields.items()
+        }
+        self.positive = [name for name in POSITIVE_FIELDS[table] if name in self.columns]
+        # Valida a lista inteira de uma vez (o laço roda no pydantic-core).
+        self.adapter = TypeAdapter(List[self.model])
+
+    def validate(self, rows: Sequence[Sequence]) -> Tuple[List[BaseModel], List[int], Dict[int, str]]:
+        """
+        Returns:
+            Tuple: (modelos válidos, índice de cada um no lote, {índice: motivo} das linhas rejeitadas).
+        """
+        errors: Dict[int, str] = {}
+        names = list(self.mapping.values())
+        columns = []
+
+        # Normalização coluna a coluna. Valores vazios viram None e são omitidos
+        # do registro: vale o padrão do modelo (ou o erro de campo obrigatório).
+        # Transpõe o lote (em C); linhas mais curtas que o cabeçalho são completadas com None.
+        transposed = list(zip_longest(*rows))
+        for index, name in self.mapping.items():
+            convert = self.converters[name]
+            column = transposed[index] if index < len(transposed) else [None] * len(rows)
+            values = [None if value is None or value == "" else convert(value) for value in column]
+            for i, value in enumerate(values):
+                if value.__class__ is _Invalid:
+                    errors[i] = f"{name}: {value.message}"
+            columns.append(values)
+
+        records = [
+            {name: value for name, value in zip(names, values) if value is not None}
+            for values in zip(*columns)
+        ]
+
+        candidates = [i for i in range(len(rows)) if i not in errors]
+        try:
+            models = self.adapter.validate_python([records[i] for i in candidates])
+        except ValidationError as e:
+            for error in e.errors():
+                i = candidates[error["loc"][0]]
+                location = ".".join(str(part) for part in error["loc"][1:])
+                errors.setdefault(i, f"{location}: {error['msg']}")
+            # Revalida só as linhas sem erro.
+            candidates = [i for i in candidates if i not in errors]
+            models = self.adapter.validate_python([records[i] for i in candidates])
+
+        valid, positions = [], []
+        for i, model in zip(candidates, models):
+            bad = next((name for name in self.positive if getattr(model, name) <= 0), None)
+            if bad:
+                errors[i] = f"{bad}: deve ser maior que zero"
+            else:
+                valid.append(model)
+                positions.append(i)
+        return valid, positions, errors
+
+
+# --- Carga no banco ---
+
+def _create_staging(conn: Connection, table: str, columns: Sequence[str]) -> str:
+    staging = f"_import_{table}"
+    conn.execute(text(f"DROP TABLE IF EXISTS {staging}"))
+    # Mesmos tipos das colunas da tabela final, sem restrições nem valores padrão.
+    conn.execute(text(f"CREATE TEMP TABLE {staging} AS SELECT {', '.join(columns)} FROM {table} LIMIT 0"))
+    conn.execute(text(f"ALTER TABLE {staging} ADD COLUMN {_LINE_COLUMN} BIGINT"))
+    return staging
+
+
+def _copy_rows(conn: Connection, staging: str, columns: Sequence[str], rows: List[tuple]) -> None:
+    """Carrega um lote na staging: COPY no Postgres (psycopg2), executemany nos demais bancos."""
+    all_columns = [*columns, _LINE_COLUMN]
+    if conn.dialect.driver == "psycopg2":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([r"\N" if value is None else value for value in row])
+        buffer.seek(0)
+        with conn.connection.dbapi_connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {staging} ({', '.join(all_columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                buffer,
+            )
+    else:
+        placeholders = ", ".join(f":{name}" for name in all_columns)
+        conn.execute(
+            text(f"INSERT INTO {staging} ({', '.join(all_columns)}) VALUES ({placeholders})"),
+            [
+                {name: float(value) if isinstance(value, Decimal) else value for name, value in zip(all_columns, row)}
+                for row in rows
+            ],
+        )
+
+
+def _merge_staging(conn: Connection, table: str, staging: str, columns: Sequence[str]) -> int:
+    """Insere na tabela final as linhas da staging que ainda não existem. Retorna quantas entraram."""
+    keys = [k for k in DEDUPE_KEYS[table] if k in columns]
+    cols = ", ".join(columns)
+    match = " AND ".join(f"t.{k} = s.{k}" for k in keys)
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(f"ANALYZE {staging}"))
+    # Anti-join na forma LEFT JOIN ... IS NULL: o Postgres usa hash anti-join e o
+    # SQLite cria um índice automático (com NOT EXISTS ele varre a tabela por linha).
+    # As colunas de DEDUPE_KEYS são NOT NULL na tabela final.
+    result = conn.execute(text(f"""
+        INSERT INTO {table} ({cols})
+        SELECT {', '.join(f's.{c}' for c in columns)} FROM (
+            SELECT {cols}, ROW_NUMBER() OVER (PARTITION BY {', '.join(keys)} ORDER BY {_LINE_COLUMN}) AS _ocorrencia
+            FROM {staging}
+        ) s
+        LEFT JOIN {table} t ON {match}
+        WHERE s._ocorrencia = 1 AND t.{keys[0]} IS NULL
+    """))
+    conn.execute(text(f"DROP TABLE IF EXISTS {staging}"))
+    return result.rowcount
+
+
+def import_file(
+    engine: Optional[Engine],
+    table: str,
+    path: str | Path,
+    column_map: Optional[Dict[str, str]] = None,
+    sheet: Optional[str] = None,
+    delimiter: Optional[str] = None,
+    encoding: str = "utf-8-sig",
+    batch_size: int = 5_000,
+    reject_path: Optional[str | Path] = None,
+    dry_run: bool = False,
+    progress: Optional[Callable[[ImportReport], None]] = None,
+    decimal: str = ",",
+) -> ImportReport:
+    """
+    Importa uma planilha CSV/XLSX para a tabela `custos`, `vendas` ou `abates`.
+
+    A importação é atômica: ou todas as linhas válidas e inéditas entram, ou nenhuma.
+    Reexecutar com o mesmo arquivo não duplica registros.
+
+    Args:
+        engine (Optional[Engine]): Engine SQLAlchemy do banco (pode ser None em `dry_run`).
+        table (str): Tabela de destino.
+        path (str | Path): Caminho da planilha.
+        column_map (Optional[Dict[str, str]]): Mapeamento explícito {coluna da planilha: campo do modelo}.
+        sheet (Optional[str]): Aba do XLSX (padrão: a aba ativa).
+        delimiter (Optional[str]): Separador do CSV (padrão: detectado automaticamente).
+        encoding (str): Codificação do CSV.
+        batch_size (int): Linhas lidas, validadas e copiadas por lote.
+        reject_path (Optional[str | Path]): Arquivo CSV de linhas rejeitadas (padrão: `<arquivo>.rejeitados.csv`).
+        dry_run (bool): Só valida, sem gravar no banco.
+        progress (Optional[Callable[[ImportReport], None]]): Chamada após cada lote.
+        decimal (str): Separador decimal dos números da planilha: ',' (formato brasileiro,
+            1.234,56) ou '.' (1,234.56). Números só com separador de milhar, como 1.500 com
+            ',', são ambíguos e rejeitados.
+
+    Returns:
+        ImportReport: Contagens, duração e vazão (linhas/s) da importação.
+    """
+    if table not in MODELS:
+        raise ValueError(f"Tabela '{table}' não suportada. Use: {', '.join(MODELS)}.")
+    if decimal not in DECIMAL_SEPARATORS:
+        raise ValueError(f"Separador decimal '{decimal}' inválido. Use ',' ou '.'.")
+
+    path = Path(path)
+    report = ImportReport(table=table, source=str(path), dry_run=dry_run)
+    reject_path = Path(reject_path) if reject_path else path.with_name(f"{path.stem}.rejeitados.csv")
+    reject_file = reject_writer = None
+    started = time.perf_counter()
+
+    header, rows = read_spreadsheet(path, sheet=sheet, delimiter=delimiter, encoding=encoding)
+    conn = transaction = None
+    try:
+        mapping, report.unmapped_columns = map_columns(table, header, column_map)
+        validator = _BatchValidator(table, mapping, decimal)
+        columns = validator.columns
+        values_of = attrgetter(*columns)
+
+        if not dry_run:
+            conn = engine.connect()
+            transaction = conn.begin()
+        staging = _create_staging(conn, table, columns) if conn is not None else None
+        line = 1  # O cabeçalho é a linha 1.
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            # Linhas totalmente vazias (comuns no fim de planilhas XLSX) são ignoradas.
+            numbered = [
+                (line + n, row) for n, row in enumerate(batch, start=1)
+                if any(value not in (None, "") for value in row)
+            ]
+            line += len(batch)
+            lines = [n for n, _ in numbered]
+            batch = [row for _, row in numbered]
+
+            valid, positions, errors = validator.validate(batch)
+            report.rows_read += len(batch)
+            report.rows_valid += len(valid)
+            report.rows_rejected += len(errors)
+
+            if errors:
+                if reject_writer is None:
+                    reject_file = open(reject_path, "w", newline="", encoding="utf-8-sig")
+                    reject_writer = csv.writer(reject_file)
+                    reject_writer.writerow([_LINE_COLUMN, "_erro", *header])
+                    report.reject_file = str(reject_path)
+                for i in sorted(errors):
+                    reject_writer.writerow([lines[i], errors[i], *batch[i]])
+
+            if conn is not None and valid:
+                _copy_rows(conn, staging, columns, [
+                    (*values_of(model), lines[i]) for model, i in zip(valid, positions)
+                ])
+
+            report.seconds = time.perf_counter() - started
+            if progress:
+                progress(report)
+
+        if conn is not None:
+            report.rows_inserted = _merge_staging(conn, table, staging, columns)
+            report.rows_duplicated = report.rows_valid - report.rows_inserted
+            transaction.commit()
+    except BaseException:
+        if transaction is not None:
+            transaction.rollback()
+        raise
+    finally:
+        if reject_file is not None:
+            reject_file.close()
+        if conn is not None:
+            conn.close()
+        rows.close()
+
+    report.seconds = time.perf_counter() - started
+    return report
@@ -0,0 +1,249 @@
+# app/tools/sql_tools.py
+import asyncio
+import re
+from decimal import Decimal
+from typing import Any, Dict, List, Literal, Optional, Sequence, Type
+
+from langchain_community.tools.sql_database.tool import QuerySQLDatabaseTool
+from langchain_community.utilities.sql_database import truncate_word
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
+from pydantic import BaseModel, Field
+from sqlalchemy import text
+from sqlalchemy.exc import ResourceClosedError, SQLAlchemyError
+
+from app.core.config import EXPORT_DIR, SQL_INLINE_MAX_ROWS, SQL_STREAM_CHUNK_SIZE
+from app.tools.export_tools import ExportError, ExportWriter
+
+# Quantas linhas do início do resultado acompanham o resumo de um resultado grande.
+PREVIEW_ROWS = 5
+
+# O resumo só soma colunas que são claramente quantidades ou valores (ex: total,
+# quantidade_kg); preços unitários, médias e outras colunas numéricas recebem só
+# mínimo e máximo, e identificadores (id, id_lote, venda_id) são ignorados.
+_SUMMABLE_WORDS = {
+    "total", "valor", "quantidade", "qtd", "qtde", "kg", "peixes", "receita", "faturamento",
+    "custo", "custos", "gasto", "gastos", "despesa", "despesas", "montante", "soma", "sum", "count",
+}
+_NON_SUMMABLE_WORDS = {
+    "preco", "preço", "unitario", "unitário", "medio", "médio", "media", "média", "avg", "por",
+    "taxa", "percentual", "pct", "ano", "mes", "mês", "dia",
+}
+
+
+def _column_words(name: str) -> set:
+    return set(re.split(r"[\W_]+", name.lower())) - {""}
+
+
+def _is_id_column(name: str) -> bool:
+    return "id" in _column_words(name)
+
+
+def _is_summable_column(name: str) -> bool:
+    words = _column_words(name)
+    return bool(words & _SUMMABLE_WORDS) and not words & _NON_SUMMABLE_WORDS
+
+
+class _StreamedResult:
+    """
+    Consome o resultado de uma consulta bloco a bloco.
+
+    Resultados pequenos (até `inline_max_rows` linhas) são devolvidos inteiros,
+    no mesmo formato do SQLDatabase.run. Ao passar do limite, as linhas passam a
+    ser gravadas em arquivo e o agente recebe só um resumo: contagem de linhas,
+    totais das colunas de quantidades/valores, mínimo e máximo das demais colunas
+    numéricas, as primeiras linhas e o identificador do arquivo.
+    A memória usada não depende do tamanho do resultado.
+    """
+
+    def __init__(self, columns: Sequence[str], inline_max_rows: int, export_format: str, export_dir: str, max_string_length: int):
+        self.columns = list(columns)
+        self.inline_max_rows = inline_max_rows
+        self.export_format = export_format
+        self.export_dir = export_dir
+        self.max_string_length = max_string_length
+        self.row_count = 0
+        self._rows: List[tuple] = []
+        self._writer: Optional[ExportWriter] = None
+        # Por coluna numérica: [soma, mínimo, máximo].
+        self._stats: Dict[int, list] = {}
+        self._ignored = {i for i, name in enumerate(self.columns) if _is_id_column(name)}
+        self._summable = {i for i, name in enumerate(self.columns) if _is_summable_column(name)}
+
+    def feed(self, rows: Sequence[Sequence]) -> None:
+        self.row_count += len(rows)
+        self._update_stats(rows)
+
+        if self._writer is None:
+            if self.row_count <= self.inline_max_rows:
+                self._rows.extend(tuple(row) for row in rows)
+                return
+            # Passou do limite: despeja o que estava em memória no arquivo e
+            # guarda só a prévia.
+            self._writer = ExportWriter(self.columns, self.export_format, self.export_dir)
+            self._writer.write_rows(self._rows)
+            self._rows = (self._rows + [tuple(row) for row in rows[:PREVIEW_ROWS]])[:PREVIEW_ROWS]
+        self._writer.write_rows(rows)
+
+    def _update_stats(self, rows: Sequence[Sequence]) -> None:
+        for row in rows:
+            for i, value in enumerate(row):
+                if i in self._ignored or isinstance(value, bool) or not isinstance(value, (int, float, Decimal)):
+                    continue
+                stats = self._stats.get(i)
+                if stats is None:
+                    self._stats[i] = [value, value, value]
+                else:
+                    stats[0] += value
+                    stats[1] = min(stats[1], value)
+                    stats[2] = max(stats[2], value)
+
+    def _format_rows(self, rows: List[tuple]) -> str:
+        return str([
+            tuple(truncate_word(value, length=self.max_string_length) for value in row)
+            for row in rows
+        ])
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            self._writer.abort()
+
+    def finish(self) -> str:
+        if self._writer is None:
+            return self._format_rows(self._rows) if self._rows else ""
+
+        path = self._writer.close()
+        size_kb = path.stat().st_size / 1024
+        file_line = f"arquivo {self.export_format.upper()} ({size_kb:.0f} KB): {self._writer.handle}"
+        row_label = "1 linha" if self.row_count == 1 else f"{self.row_count} linhas"
+        if self.inline_max_rows and self.row_count > self.inline_max_rows:
+            lines = [
+                f"Resultado com {row_label}, grande demais para exibir por completo.",
+                f"Resultado completo salvo em {file_line}",
+            ]
+        else:
+            lines = [f"Resultado com {row_label} salvo em {file_line}"]
+        lines.append(f"Colunas: {', '.join(self.columns)}")
+        if self._stats:
+            lines.append("Resumo das colunas numéricas:")
+            for i, (total, minimum, maximum) in sorted(self._stats.items()):
+                summary = f"mínimo={_format_number(minimum)}, máximo={_format_number(maximum)}"
+                if i in self._summable:
+                    summary = f"soma={_format_number(total)}, {summary}"
+                lines.append(f"- {self.columns[i]}: {summary}")
+        if self.row_count <= PREVIEW_ROWS:
+            lines.append(f"Linhas: {self._format_rows(self._rows)}")
+        else:
+            lines.append(f"Primeiras {len(self._rows)} linhas: {self._format_rows(self._rows)}")
+        return "\n".join(lines)
+
+
+def _format_number(value) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return f"{float(value):.2f}"
+
+
+class StreamingQuerySQLDatabaseTool(QuerySQLDatabaseTool):
+    """
+    Variante da ferramenta `sql_db_query` que lê o resultado em streaming.
+
+    A consulta roda com cursor do lado do servidor (`stream_results` no psycopg2,
+    `AsyncConnection.stream` no asyncpg) e as linhas são lidas em blocos de
+    `chunk_size`. Resultados grandes vão para um arquivo CSV/XLSX em vez do
+    contexto do LLM (e do checkpoint): veja `_StreamedResult`.
+
+    O caminho síncrono usa a engine do SQLDatabase (psycopg2); o assíncrono usa
+    `async_engine` (asyncpg), sem ocupar uma thread durante a ida ao banco.
+    """
+
+    # AsyncEngine (ou qualquer objeto com a mesma interface `begin()`/`stream()`).
+    async_engine: Any = Field(default=None, exclude=True)
+    inline_max_rows: int = SQL_INLINE_MAX_ROWS
+    chunk_size: int = SQL_STREAM_CHUNK_SIZE
+    export_dir: str = EXPORT_DIR
+    export_format: str = "csv"
+
+    def _new_result(self, columns: Sequence[str], export_format: str) -> _StreamedResult:
+        return _StreamedResult(
+            columns, self.inline_max_rows, export_format, self.export_dir, self.db._max_string_length
+        )
+
+    def _stream(self, query: str, export_format: str) -> str:
+        try:
+            # begin(): mesma semântica transacional do SQLDatabase.run.
+            with self.db._engine.begin() as conn:
+                result = conn.execution_options(
+                    stream_results=True, max_row_buffer=self.chunk_size
+                ).execute(text(query))
+                if not result.returns_rows:
+                    return ""
+                streamed = self._new_result(list(result.keys()), export_format)
+                try:
+                    for rows in result.partitions(self.chunk_size):
+                        streamed.feed(rows)
+                except BaseException:
+                    streamed.abort()
+                    raise
+        except (SQLAlchemyError, ExportError) as e:
+            # Mesmo contrato do SQLDatabase.run_no_throw: o erro volta para o LLM corrigir a consulta.
+            return f"Error: {e}"
+        return streamed.finish()
+
+    async def _astream(self, query: str, export_format: str) -> str:
+        if self.async_engine is None:
+            # Sem engine assíncrona, roda o caminho síncrono fora do event loop.
+            return await asyncio.to_thread(self._stream, query, export_format)
+        try:
+            async with self.async_engine.begin() as conn:
+                result = await conn.stream(text(query))
+                try:
+                    columns = list(result.keys())
+                except ResourceClosedError:
+                    # Comando sem linhas (ex: UPDATE): o AsyncResult não expõe `returns_rows`.
+                    return ""
+                streamed = self._new_result(columns, export_format)
+                try:
+                    async for rows in result.partitions(self.chunk_size):
+                        streamed.feed(rows)
+                except BaseException:
+                    streamed.abort()
+                    raise
+        except (SQLAlchemyError, ExportError) as e:
+            return f"Error: {e}"
+        return streamed.finish()
+
+    def _run(self, query: str, run_manager: Optional[CallbackManagerForToolRun] = None) -> str:
+        return self._stream(query, self.export_format)
+
+    async def _arun(self, query: str, run_manager: Optional[AsyncCallbackManagerForToolRun] = None) -> str:
+        return await self._astream(query, self.export_format)
+
+
+class _ExportSQLQueryInput(BaseModel):
+    query: str = Field(..., description="A detailed and correct SQL query.")
+    formato: Literal["csv", "xlsx"] = Field(
+        default="csv", description="File format: 'csv' or 'xlsx' (Excel spreadsheet)."
+    )
+
+
+class ExportSQLQueryTool(StreamingQuerySQLDatabaseTool):
+    """
+    Ferramenta `sql_db_export`: grava sempre o resultado completo em arquivo,
+    para quando o usuário pede uma planilha ou um arquivo com os dados.
+    """
+
+    name: str = "sql_db_export"
+    description: str = (
+        "Use when the user asks for a spreadsheet, file or export of the data. "
+        "Input is a SQL query and a file format ('csv' or 'xlsx'). The full result is streamed to a file; "
+        "the output is a summary of the result and the file handle (export:...). "
+        "Always include the file handle in your final answer so the file can be sent to the user."
+    )
+    args_schema: Type[BaseModel] = _ExportSQLQueryInput
+    inline_max_rows: int = 0
+
+    def _run(self, query: str, formato: str = "csv", run_manager: Optional[CallbackManagerForToolRun] = None) -> str:
+        return self._stream(query, formato) or "A consulta não retornou linhas; nenhum arquivo foi gerado."
+
+    async def _arun(self, query: str, formato: str = "csv", run_manager: Optional[AsyncCallbackManagerForToolRun] = None) -> str:
+        return await self._astream(query, formato) or "A consulta não retornou linhas; nenhum arquivo foi gerado."
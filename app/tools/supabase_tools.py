@@ -52,15 +52,17 @@ def get_database_connection():
         raise
 
 # app/tools/supabase_tools.py
+import asyncio
 import psycopg2
 import logging
 from langchain_community.utilities import SQLDatabase
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from app.core.config import (
-    DATABASE_URL, SUPABASE_URL, SUPABASE_KEY, 
+    DATABASE_URL, ASYNC_DATABASE_URL, SUPABASE_URL, SUPABASE_KEY, 
     DB_HOST, DB_NAME, DB_USER, DB_PASS, DB_PORT
 )
-from supabase import create_client, Client
-from typing import Dict, Any, List
+from supabase import create_client, Client, acreate_client, AsyncClient
+from typing import Dict, Any, List, Optional
 
 # Configuração do logging
 logging.basicConfig(level=logging.INFO)
@@ -76,6 +78,23 @@ except Exception as e:
     logger.error(f"Erro fatal ao inicializar o cliente Supabase: {e}")
     raise
 
+# O cliente assíncrono precisa ser criado dentro de um event loop, então é
+# inicializado na primeira chamada de get_async_supabase_client(). O lock evita
+# que chamadas concorrentes de ferramentas (executadas em paralelo no mesmo
+# passo) criem um cliente cada.
+_async_supabase_client: Optional[AsyncClient] = None
+_async_supabase_lock = asyncio.Lock()
+
+async def get_async_supabase_client() -> AsyncClient:
+    """Retorna o cliente assíncrono da API do Supabase, criando-o na primeira chamada."""
+    global _async_supabase_client
+    if _async_supabase_client is None:
+        async with _async_supabase_lock:
+            if _async_supabase_client is None:
+                logger.info("Inicializando cliente assíncrono da API do Supabase...")
+                _async_supabase_client = await acreate_client(SUPABASE_URL, SUPABASE_KEY)
+    return _async_supabase_client
+
 # --- Funções de Metadados ---
 
 def get_all_table_names() -> List[str]:
@@ -120,6 +139,13 @@ def get_database_connection():
         logger.error(f"Erro fatal ao conectar via SQL: {e}")
         raise
 
+def get_async_database_engine() -> AsyncEngine:
+    """
+    Cria a engine assíncrona (asyncpg) usada pelo agente SQL no caminho assíncrono.
+    A conexão só é aberta na primeira consulta.
+    """
+    return create_async_engine(ASYNC_DATABASE_URL, pool_pre_ping=True)
+
 # --- Ferramentas de Escrita (para Entry Agent) ---
 
 def insert_record(table_name: str, record: Dict[str, Any]) -> str:
@@ -129,17 +155,7 @@ def insert_record(table_name: str, record: Dict[str, Any]) -> str:
     logger.info(f"Iniciando inserção na tabela '{table_name}' com o registro: {record}")
     try:
         response = supabase_client.table(table_name).insert(record).execute()
-        logger.info(f"Resposta da API Supabase (insert): {response}")
-
-        # Verificação robusta da resposta
-        if response.data and len(response.data) > 0:
-            # O Supabase retorna uma lista de registros inseridos. Pegamos o primeiro.
-            inserted_record = response.data[0]
-            return f"Registro inserido com sucesso: {inserted_record}"
-        else:
-            logger.warning(f"A operação de inserção na tabela '{table_name}' não retornou dados. Resposta: {response}")
-            return "A operação de inserção foi executada, mas não retornou dados para confirmação."
-
+        return _insert_result(table_name, response)
     except StopIteration:
         logger.error("Erro de StopIteration capturado durante a inserção. Isso pode indicar um problema com o stream de resposta do Supabase.")
         return "Erro crítico: Ocorreu um StopIteration ao tentar inserir o registro."
@@ -147,6 +163,31 @@ def insert_record(table_name: str, record: Dict[str, Any]) -> str:
         logger.error(f"Falha ao inserir registro na tabela '{table_name}'. Erro: {e}")
         return f"Falha ao inserir registro. Erro: {e}"
 
+async def ainsert_record(table_name: str, record: Dict[str, Any]) -> str:
+    """
+    Versão assíncrona de insert_record, usando o cliente assíncrono do Supabase.
+    """
+    logger.info(f"Iniciando inserção (async) na tabela '{table_name}' com o registro: {record}")
+    try:
+        client = await get_async_supabase_client()
+        response = await client.table(table_name).insert(record).execute()
+        return _insert_result(table_name, response)
+    except Exception as e:
+        logger.error(f"Falha ao inserir registro na tabela '{table_name}'. Erro: {e}")
+        return f"Falha ao inserir registro. Erro: {e}"
+
+def _insert_result(table_name: str, response) -> str:
+    logger.info(f"Resposta da API Supabase (insert): {response}")
+
+    # Verificação robusta da resposta
+    if response.data and len(response.data) > 0:
+        # O Supabase retorna uma lista de registros inseridos. Pegamos o primeiro.
+        inserted_record = response.data[0]
+        return f"Registro inserido com sucesso: {inserted_record}"
+    else:
+        logger.warning(f"A operação de inserção na tabela '{table_name}' não retornou dados. Resposta: {response}")
+        return "A operação de inserção foi executada, mas não retornou dados para confirmação."
+
 def update_record(table_name: str, record_id: Any, updates: Dict[str, Any]) -> str:
     """
     Atualiza um registro específico em uma tabela com base em seu ID.
@@ -154,19 +195,34 @@ def update_record(table_name: str, record_id: Any, updates: Dict[str, Any]) -> s
     logger.info(f"Iniciando atualização na tabela '{table_name}' para o ID '{record_id}' com os dados: {updates}")
     try:
         response = supabase_client.table(table_name).update(updates).eq('id', record_id).execute()
-        logger.info(f"Resposta da API Supabase (update): {response}")
-
-        if response.data and len(response.data) > 0:
-            updated_record = response.data[0]
-            return f"Registro ID '{record_id}' atualizado com sucesso: {updated_record}"
-        else:
-            logger.warning(f"Nenhum registro encontrado com o ID '{record_id}' para atualizar na tabela '{table_name}'.")
-            return f"Nenhum registro encontrado com o ID '{record_id}' para atualizar."
+        return _update_result(table_name, record_id, response)
+    except Exception as e:
+        logger.error(f"Falha ao atualizar o registro ID '{record_id}'. Erro: {e}")
+        return f"Falha ao atualizar o registro. Erro: {e}"
 
+async def aupdate_record(table_name: str, record_id: Any, updates: Dict[str, Any]) -> str:
+    """
+    Versão assíncrona de update_record.
+    """
+    logger.info(f"Iniciando atualização (async) na tabela '{table_name}' para o ID '{record_id}' com os dados: {updates}")
+    try:
+        client = await get_async_supabase_client()
+        response = await client.table(table_name).update(updates).eq('id', record_id).execute()
+        return _update_result(table_name, record_id, response)
     except Exception as e:
         logger.error(f"Falha ao atualizar o registro ID '{record_id}'. Erro: {e}")
         return f"Falha ao atualizar o registro. Erro: {e}"
 
+def _update_result(table_name: str, record_id: Any, response) -> str:
+    logger.info(f"Resposta da API Supabase (update): {response}")
+
+    if response.data and len(response.data) > 0:
+        updated_record = response.data[0]
+        return f"Registro ID '{record_id}' atualizado com sucesso: {updated_record}"
+    else:
+        logger.warning(f"Nenhum registro encontrado com o ID '{record_id}' para atualizar na tabela '{table_name}'.")
+        return f"Nenhum registro encontrado com o ID '{record_id}' para atualizar."
+
 def delete_record(table_name: str, record_id: Any) -> str:
     """
     Deleta um registro específico em uma tabela com base em seu ID.
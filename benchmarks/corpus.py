@@ -0,0 +1,151 @@
+# benchmarks/corpus.py
+# Corpus de comandos representativos (em português) com o roteiro que um LLM
+# real seguiria para cada um, de acordo com o ORCHESTRATOR_SYSTEM_PROMPT.
+
+from datetime import date, timedelta
+from typing import List, Optional
+
+from .fakes import LAST_TOOL_RESULT, TurnScript
+
+
+def _report_step(command: str) -> list:
+    return [{
+        "name": "ReportFormattingTool",
+        "args": {"user_intent": command, "operation_result": LAST_TOOL_RESULT},
+    }]
+
+
+def _read(command: str, queries: List[str], report: str) -> TurnScript:
+    return TurnScript(
+        command=command,
+        steps=[
+            [{"name": "SQLQueryTool", "args": {"question": command}}],
+            _report_step(command),
+        ],
+        sql_queries=queries,
+        final_answer=report,
+        report=report,
+        kind="read",
+    )
+
+
+def _write(command: str, search: dict, register: dict, report: str) -> TurnScript:
+    return TurnScript(
+        command=command,
+        steps=[[search], [register], _report_step(command)],
+        final_answer=report,
+        report=report,
+        kind="write",
+    )
+
+
+def build_corpus(today: Optional[date] = None) -> List[TurnScript]:
+    """Monta o corpus de turnos, com datas relativas a `today`."""
+    today = today or date.today()
+    hoje = today.isoformat()
+    inicio_mes = today.replace(day=1).isoformat()
+    inicio_ano = today.replace(month=1, day=1).isoformat()
+    noventa_dias = (today - timedelta(days=90)).isoformat()
+    inicio_mes_passado = (today.replace(day=1) - timedelta(days=1)).replace(day=1).isoformat()
+
+    return [
+        _read(
+            "Quanto vendemos de Pintado este mês?",
+            [f"SELECT SUM(quantidade_kg) AS kg, SUM(total) AS faturamento FROM vendas "
+             f"WHERE produto = 'Pintado' AND data >= '{inicio_mes}'"],
+            "📊 **Vendas de Pintado no mês:** consulte os totais acima.",
+        ),
+        _write(
+            "Registrar custo de R$ 200 de combustível hoje",
+            {"name": "buscar_custos_similares", "args": {"termo_busca": "combustivel"}},
+            {"name": "registrar_custo", "args": {"custo": {
+                "data": hoje, "descricao": "Combustível", "total": 200.0,
+                "classe": "Variável", "categoria": "Transporte", "sub_categoria": "combustivel",
+                "forma_pagamento": "Pix",
+            }}},
+            "✅ **Despesa Registrada com Sucesso!**",
+        ),
+        _read(
+            "Quais clientes estão com pagamento pendente?",
+            ["SELECT cliente, COUNT(*) AS vendas, SUM(total) AS valor_pendente FROM vendas "
+             "WHERE status_venda = 'pendente' GROUP BY cliente ORDER BY valor_pendente DESC"],
+            "💰 **Clientes com pagamentos pendentes** listados acima.",
+        ),
+        _write(
+            "Vendi 50 kg de Pintado inteiro para o Mercado Central a R$ 32 o kg, pago no Pix, lote L12",
+            {"name": "buscar_vendas_similares", "args": {"cliente": "Mercado Central"}},
+            {"name": "registrar_venda", "args": {"venda": {
+                "data": hoje, "cliente": "Mercado Central", "estabelecimento": "",
+                "produto": "Pintado", "tipo_produto": "inteiro", "quantidade_kg": 50.0,
+                "preco_por_kg": 32.0, "total": 1600.0, "status_venda": "pago",
+                "lote": "L12", "forma_pagamento": "Pix",
+            }}},
+            "✅ **Venda Registrada com Sucesso!**",
+        ),
+        _read(
+            "Qual o total de custos por categoria no ano?",
+            [f"SELECT categoria, SUM(total) AS total FROM custos WHERE data >= '{inicio_ano}' "
+             f"GROUP BY categoria ORDER BY total DESC"],
+            "📊 **Custos por categoria no ano** listados acima.",
+        ),
+        _write(
+            "Registrar abate de hoje: 300 peixes, 450 kg, espécie Pintado, lote L12, tanque 3",
+            {"name": "buscar_abates_similares", "args": {}},
+            {"name": "registrar_abate", "args": {"abate": {
+                "data": hoje, "especie": "Pintado", "lote": "L12", "quantidade_peixes": 300,
+                "quantidade_kg": 450, "tanque_gaiola": "Tanque 3", "peso_medio": 1.5,
+            }}},
+            "✅ **Abate Registrado com Sucesso!**",
+        ),
+        _read(
+            "Quantos kg foram abatidos por lote nos últimos 90 dias?",
+            [f"SELECT lote, SUM(quantidade_kg) AS kg, SUM(quantidade_peixes) AS peixes FROM abates "
+             f"WHERE data >= '{noventa_dias}' GROUP BY lote ORDER BY kg DESC"],
+            "🐟 **Produção por lote (90 dias)** listada acima.",
+        ),
+        # Resultado grande: vai para um arquivo e o LLM recebe só o resumo.
+        _read(
+            "Quais são todas as vendas pendentes do ano?",
+            [f"SELECT data, cliente, produto, quantidade_kg, total FROM vendas "
+             f"WHERE status_venda = 'pendente' AND data >= '{inicio_ano}' ORDER BY data"],
+            "💰 **Vendas pendentes do ano**: resumo acima, lista completa no arquivo.",
+        ),
+        _read(
+            "Mostre as 5 últimas vendas",
+            ["SELECT data, cliente, produto, quantidade_kg, total, status_venda FROM vendas "
+             "ORDER BY data DESC LIMIT 5"],
+            "🧾 **Últimas 5 vendas** listadas acima.",
+        ),
+        # Duas perguntas independentes no mesmo passo: no modo assíncrono, o
+        # ToolNode executa as duas chamadas ao agente SQL concorrentemente.
+        TurnScript(
+            command="Quanto vendemos e quanto gastamos este mês?",
+            steps=[
+                [
+                    {"name": "SQLQueryTool", "args": {"question": "Quanto vendemos este mês?"}},
+                    {"name": "SQLQueryTool", "args": {"question": "Quanto gastamos este mês?"}},
+                ],
+                _report_step("Quanto vendemos e quanto gastamos este mês?"),
+            ],
+            sql_queries={
+                "Quanto vendemos este mês?": [
+                    f"SELECT SUM(total) FROM vendas WHERE data >= '{inicio_mes}'",
+                ],
+                "Quanto gastamos este mês?": [
+                    f"SELECT SUM(total) FROM custos WHERE data >= '{inicio_mes}'",
+                ],
+            },
+            final_answer="📊 **Vendas e custos do mês** listados acima.",
+            report="📊 **Vendas e custos do mês** listados acima.",
+            kind="read",
+        ),
+        _read(
+            "Qual foi o lucro do mês passado?",
+            [
+                f"SELECT SUM(total) FROM vendas WHERE status_venda = 'pago' "
+                f"AND data >= '{inicio_mes_passado}' AND data < '{inicio_mes}'",
+                f"SELECT SUM(total) FROM custos WHERE data >= '{inicio_mes_passado}' AND data < '{inicio_mes}'",
+            ],
+            "📈 **Resultado do período** calculado acima.",
+        ),
+    ]
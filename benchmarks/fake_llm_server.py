@@ -0,0 +1,217 @@
+# benchmarks/fake_llm_server.py
+# Servidor HTTP local que imita o endpoint /v1/chat/completions da OpenAI, com
+# latência injetável. Serve para exercitar o deadline e o hedge do
+# ResilientChatModel sem chamar a API real.
+#
+# Uso:
+#   python -m benchmarks.fake_llm_server --port 8765 --latency 0.2 --spike-prob 0.1 --spike 5
+#   OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=fake python main.py
+
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class LatencyProfile:
+    """Distribuição de latência: base + jitter uniforme, com picos ocasionais."""
+    base: float = 0.1
+    jitter: float = 0.0
+    spike_probability: float = 0.0
+    spike_seconds: float = 0.0
+
+    def sample(self) -> float:
+        latency = self.base + random.uniform(0, self.jitter)
+        if random.random() < self.spike_probability:
+            latency += self.spike_seconds
+        return latency
+
+
+class FakeLLMServer:
+    """
+    Servidor falso compatível com a API de chat da OpenAI.
+
+    As respostas saem de uma fila de respostas roteirizadas (conteúdo de texto ou
+    tool_calls, com latência ou status de erro próprios); com a fila vazia,
+    responde `default_reply`. A latência e a fila
+    podem ser alteradas em tempo de execução via POST /control.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 latency: Optional[LatencyProfile] = None, default_reply: str = "ok"):
+        self.latency = latency or LatencyProfile()
+        self.default_reply = default_reply
+        self.scripted: deque = deque()
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def enqueue(self, content: str = "", tool_calls: Optional[list] = None,
+                latency: Optional[float] = None, status: int = 200) -> None:
+        """
+        Adiciona uma resposta roteirizada à fila.
+
+        Args:
+            latency (Optional[float]): Latência desta resposta (padrão: amostra do perfil).
+            status (int): Status HTTP; diferente de 200, responde com um erro no formato da OpenAI.
+        """
+        with self._lock:
+            self.scripted.append({"content": content, "tool_calls": tool_calls, "latency": latency, "status": status})
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _next_scripted(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self.requests_served += 1
+            return self.scripted.popleft() if self.scripted else None
+
+    def _completion(self, body: Dict[str, Any], scripted: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        message: Dict[str, Any] = {"role": "assistant", "content": self.default_reply}
+        finish_reason = "stop"
+        if scripted:
+            message["content"] = scripted["content"]
+            if scripted["tool_calls"]:
+                message["tool_calls"] = [
+                    {
+                        "id": call.get("id", f"call_{uuid.uuid4().hex[:12]}"),
+                        "type": "function",
+                        "function": {
+                            "name": call["name"],
+                            "arguments": json.dumps(call.get("args", {}), ensure_ascii=False),
+                        },
+                    }
+                    for call in scripted["tool_calls"]
+                ]
+                finish_reason = "tool_calls"
+
+        # Estimativa grosseira de tokens (~4 caracteres por token).
+        prompt_tokens = len(json.dumps(body.get("messages", []))) // 4
+        completion_tokens = len(message["content"] or "") // 4
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake-llm"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                try:
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # O cliente desistiu (ex: a requisição perdedora de um hedge foi cancelada).
+                    pass
+
+            def _read_json(self) -> Dict[str, Any]:
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def do_GET(self):
+                if self.path.rstrip("/") == "/stats":
+                    self._send_json(200, {
+                        "requests_served": server.requests_served,
+                        "scripted_pending": len(server.scripted),
+                        "latency": asdict(server.latency),
+                    })
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                body = self._read_json()
+                if self.path.rstrip("/").endswith("/chat/completions"):
+                    scripted = server._next_scripted()
+                    latency = scripted["latency"] if scripted and scripted["latency"] is not None else None
+                    time.sleep(server.latency.sample() if latency is None else latency)
+                    if scripted and scripted["status"] != 200:
+                        self._send_json(scripted["status"], {"error": {
+                            "message": scripted["content"] or "erro simulado",
+                            "type": "invalid_request_error", "code": None,
+                        }})
+                    else:
+                        self._send_json(200, server._completion(body, scripted))
+                elif self.path.rstrip("/") == "/control":
+                    if "latency" in body:
+                        server.latency = LatencyProfile(**body["latency"])
+                    for response in body.get("enqueue", []):
+                        server.enqueue(
+                            response.get("content", ""), response.get("tool_calls"),
+                            response.get("latency"), response.get("status", 200),
+                        )
+                    self._send_json(200, {"ok": True})
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def log_message(self, format, *args):
+                # Silencia o log por requisição do http.server.
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor falso da API de chat da OpenAI com latência injetável.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.1, help="Latência base em segundos.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Jitter uniforme adicional em segundos.")
+    parser.add_argument("--spike-prob", type=float, default=0.0, help="Probabilidade de um pico de latência.")
+    parser.add_argument("--spike", type=float, default=0.0, help="Duração do pico em segundos.")
+    parser.add_argument("--reply", default="ok", help="Resposta padrão quando não há respostas roteirizadas.")
+    args = parser.parse_args()
+
+    server = FakeLLMServer(
+        host=args.host,
+        port=args.port,
+        latency=LatencyProfile(args.latency, args.jitter, args.spike_prob, args.spike),
+        default_reply=args.reply,
+    )
+    print(f"Servidor LLM falso ouvindo em {server.base_url}")
+    try:
+        server.start()._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
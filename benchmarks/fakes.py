@@ -0,0 +1,435 @@
+# benchmarks/fakes.py
+# Dublês usados pelos benchmarks: um chat model roteirizado (sem rede) e um
+# cliente Supabase falso que executa as operações no banco local do benchmark.
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import Field
+from sqlalchemy import Date, MetaData, Table, or_, select
+from sqlalchemy.engine import Engine
+
+# Marcador substituído, nos argumentos roteirizados, pelo conteúdo do último resultado de ferramenta.
+LAST_TOOL_RESULT = "{ultimo_resultado}"
+
+
+@dataclass
+class TurnScript:
+    """
+    Roteiro de um turno de conversa para o ScriptedChatModel.
+
+    Atributos:
+        command: O comando do usuário (também usado como chave do roteiro).
+        steps: Passos do orquestrador; cada passo é uma lista de chamadas de
+            ferramenta `{"name": ..., "args": {...}}` emitidas na mesma resposta.
+        sql_queries: Consultas que o agente SQL executa, em ordem, via `sql_db_query`.
+            Quando o turno faz mais de uma pergunta ao agente SQL, use um dicionário
+            `{pergunta: [consultas]}`.
+        final_answer: Resposta final do orquestrador.
+        report: Texto devolvido pela chain de relatório.
+        kind: 'read' (consulta) ou 'write' (registro), usado para misturar intenções.
+    """
+    command: str
+    steps: List[List[Dict[str, Any]]] = field(default_factory=list)
+    sql_queries: List[str] | Dict[str, List[str]] = field(default_factory=list)
+    final_answer: str = "Pronto."
+    report: str = "✅ **Operação concluída.**"
+    kind: str = "read"
+
+    def sql_questions(self) -> List[str]:
+        return [
+            call["args"]["question"]
+            for step in self.steps for call in step
+            if call["name"] == "SQLQueryTool"
+        ]
+
+
+class UsageStats:
+    """Contadores (thread-safe) de chamadas, tokens estimados e concorrência do modelo falso."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def enter(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def exit(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def reset_peak(self) -> None:
+        with self._lock:
+            self.peak_in_flight = self.in_flight
+
+    def record(self, prompt_tokens: int, completion_tokens: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "llm_calls": self.calls,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+            }
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa grosseira de tokens (~4 caracteres por token), suficiente para comparar commits."""
+    return len(text) // 4
+
+
+def _substitute(value: Any, last_result: str) -> Any:
+    if isinstance(value, str):
+        return value.replace(LAST_TOOL_RESULT, last_result)
+    if isinstance(value, dict):
+        return {k: _substitute(v, last_result) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_substitute(v, last_result) for v in value]
+    return value
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Chat model determinístico que responde de acordo com roteiros (TurnScript).
+
+    Identifica quem está chamando pelo prompt (orquestrador, agente SQL ou chain
+    de relatório) e decide o próximo passo apenas a partir das mensagens, sem
+    estado interno por conversa, de modo que pode atender várias conversas ao
+    mesmo tempo. `latency` permite simular o tempo de resposta de um LLM real.
+    """
+
+    scripts: Dict[str, TurnScript] = Field(default_factory=dict)
+    latency: Optional[Callable[[], float]] = None
+    stats: UsageStats = Field(default_factory=UsageStats, exclude=True)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    def add_scripts(self, scripts: Sequence[TurnScript]) -> None:
+        for script in scripts:
+            self.scripts[script.command] = script
+            for question in script.sql_questions():
+                self.scripts[question] = script
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self.stats.enter()
+        try:
+            if self.latency:
+                time.sleep(self.latency())
+            message = self._respond(messages)
+        finally:
+            self.stats.exit()
+        return self._result(messages, message)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # A espera não bloqueia o event loop, como uma chamada HTTP assíncrona real.
+        self.stats.enter()
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency())
+            message = self._respond(messages)
+        finally:
+            self.stats.exit()
+        return self._result(messages, message)
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        first = messages[0] if messages else None
+        if isinstance(first, SystemMessage) and "SQL database" in str(first.content):
+            return self._sql_step(messages)
+        if len(messages) == 1 and "DADOS RECEBIDOS PARA O RELATÓRIO" in str(first.content):
+            return self._report_step(str(first.content))
+        return self._orchestrator_step(messages)
+
+    def _result(self, messages: List[BaseMessage], message: AIMessage) -> ChatResult:
+        prompt_tokens = estimate_tokens("".join(str(m.content) for m in messages))
+        completion_tokens = estimate_tokens(str(message.content) + json.dumps(message.tool_calls, default=str))
+        message.usage_metadata = {
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        self.stats.record(prompt_tokens, completion_tokens)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    @staticmethod
+    def _tool_call(name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        return {"name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:12]}"}
+
+    def _orchestrator_step(self, messages: List[BaseMessage]) -> AIMessage:
+        # O prompt do orquestrador repete a entrada do usuário no final; o turno
+        # atual começa na mensagem humana anterior, vinda do histórico.
+        humans = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+        if not humans:
+            return AIMessage(content="Desculpe, não entendi.")
+        start = humans[-2] if len(humans) > 1 and humans[-1] == len(messages) - 1 else humans[-1]
+        turn = messages[start:]
+        script = self.scripts.get(str(messages[humans[-1]].content))
+        if script is None:
+            return AIMessage(content="Desculpe, não entendi.")
+
+        done = sum(1 for m in turn if isinstance(m, AIMessage) and m.tool_calls)
+        if done < len(script.steps):
+            tool_results = [m for m in turn if isinstance(m, ToolMessage)]
+            last_result = str(tool_results[-1].content) if tool_results else ""
+            calls = [
+                self._tool_call(call["name"], _substitute(call.get("args", {}), last_result))
+                for call in script.steps[done]
+            ]
+            return AIMessage(content="", tool_calls=calls)
+        return AIMessage(content=script.final_answer)
+
+    def _sql_step(self, messages: List[BaseMessage]) -> AIMessage:
+        humans = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+        question = str(messages[humans[-1]].content) if humans else ""
+        script = self.scripts.get(question)
+        tool_results = [m for m in messages[humans[-1] if humans else 0:] if isinstance(m, ToolMessage)]
+
+        queries = script.sql_queries if script else []
+        if isinstance(queries, dict):
+            queries = queries.get(question, [])
+        if len(tool_results) < len(queries):
+            query = queries[len(tool_results)]
+            return AIMessage(content="", tool_calls=[self._tool_call("sql_db_query", {"query": query})])
+        # Como um LLM real, a resposta final repete o resultado obtido.
+        result = str(tool_results[-1].content) if tool_results else "Nenhum resultado."
+        return AIMessage(content=f"Resultado da consulta: {result}")
+
+    def _report_step(self, prompt: str) -> AIMessage:
+        for script in self.scripts.values():
+            if script.command in prompt:
+                return AIMessage(content=script.report)
+        return AIMessage(content="✅ **Operação concluída.**")
+
+
+# --- Cliente Supabase falso ---
+
+class FakeResponse:
+    def __init__(self, data: List[Dict[str, Any]]):
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"FakeResponse(data={self.data!r})"
+
+
+def _jsonable(row: Dict[str, Any]) -> Dict[str, Any]:
+    # Devolve os tipos como o PostgREST faria (datas em ISO, numéricos como float).
+    out = {}
+    for key, value in row.items():
+        if isinstance(value, date):
+            value = value.isoformat()
+        elif isinstance(value, Decimal):
+            value = float(value)
+        out[key] = value
+    return out
+
+
+class FakeQuery:
+    """Subconjunto do query builder do supabase-py usado por app/tools, executado via SQLAlchemy."""
+
+    def __init__(self, client: "FakeSupabaseClient", table: Table):
+        self._client = client
+        self._table = table
+        self._action = "select"
+        self._payload: Any = None
+        self._filters: list = []
+        self._order = None
+        self._limit: Optional[int] = None
+
+    def _column(self, name: str):
+        return self._table.c[name]
+
+    def _coerce(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        coerced = {}
+        for key, value in record.items():
+            if key in self._table.c and isinstance(self._table.c[key].type, Date) and isinstance(value, str):
+                value = date.fromisoformat(value)
+            coerced[key] = value
+        return coerced
+
+    def select(self, *columns: str) -> "FakeQuery":
+        self._action = "select"
+        return self
+
+    def insert(self, record: Dict[str, Any]) -> "FakeQuery":
+        self._action, self._payload = "insert", self._coerce(record)
+        return self
+
+    def update(self, updates: Dict[str, Any]) -> "FakeQuery":
+        self._action, self._payload = "update", self._coerce(updates)
+        return self
+
+    def delete(self) -> "FakeQuery":
+        self._action = "delete"
+        return self
+
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        self._filters.append(self._column(column) == value)
+        return self
+
+    def ilike(self, column: str, pattern: str) -> "FakeQuery":
+        self._filters.append(self._column(column).ilike(pattern))
+        return self
+
+    def or_(self, filters: str) -> "FakeQuery":
+        clauses = []
+        for expr in filters.split(","):
+            column, op, value = expr.split(".", 2)
+            if op == "ilike":
+                clauses.append(self._column(column).ilike(value))
+            elif op == "eq":
+                clauses.append(self._column(column) == value)
+        self._filters.append(or_(*clauses))
+        return self
+
+    def order(self, column: str, desc: bool = False) -> "FakeQuery":
+        col = self._column(column)
+        self._order = col.desc() if desc else col.asc()
+        return self
+
+    def limit(self, n: int) -> "FakeQuery":
+        self._limit = n
+        return self
+
+    def _statement(self):
+        table = self._table
+        if self._action == "select":
+            stmt = select(table).where(*self._filters)
+            if self._order is not None:
+                stmt = stmt.order_by(self._order)
+            if self._limit is not None:
+                stmt = stmt.limit(self._limit)
+            return stmt
+        if self._action == "insert":
+            return table.insert().values(**self._payload).returning(table)
+        if self._action == "update":
+            return table.update().where(*self._filters).values(**self._payload).returning(table)
+        return table.delete().where(*self._filters).returning(table)
+
+    def execute(self) -> FakeResponse:
+        with self._client.engine.begin() as conn:
+            rows = conn.execute(self._statement()).mappings().all()
+        return FakeResponse([_jsonable(dict(row)) for row in rows])
+
+
+class FakeAsyncQuery(FakeQuery):
+    """Versão com `execute()` aguardável, como no `supabase.AsyncClient`."""
+
+    async def execute(self) -> FakeResponse:
+        # Como uma chamada HTTP assíncrona, nada aqui bloqueia o event loop: a
+        # latência simulada é aguardada e a consulta usa a engine assíncrona.
+        if self._client.latency:
+            await asyncio.sleep(self._client.latency())
+        async with self._client.async_engine.begin() as conn:
+            rows = (await conn.execute(self._statement())).mappings().all()
+        return FakeResponse([_jsonable(dict(row)) for row in rows])
+
+
+class FakeSupabaseClient:
+    """Imita `supabase.Client` para as tabelas do benchmark, usando a engine local."""
+
+    query_class = FakeQuery
+
+    def __init__(self, engine: Engine, latency: Optional[Callable[[], float]] = None):
+        self.engine = engine
+        self.latency = latency
+        self._metadata = MetaData()
+        self._metadata.reflect(engine)
+
+    def table(self, name: str) -> FakeQuery:
+        return self.query_class(self, self._metadata.tables[name])
+
+
+class FakeAsyncSupabaseClient(FakeSupabaseClient):
+    """Imita `supabase.AsyncClient`, executando as consultas pela `async_engine`."""
+
+    query_class = FakeAsyncQuery
+
+    def __init__(self, engine: Engine, async_engine, latency: Optional[Callable[[], float]] = None):
+        super().__init__(engine, latency)
+        self.async_engine = async_engine
+
+
+def install_fake_supabase(client: FakeSupabaseClient, async_client: Optional[FakeAsyncSupabaseClient] = None) -> None:
+    """Substitui os clientes Supabase globais usados pelas ferramentas da aplicação."""
+    from app.tools import business_tools, supabase_tools
+
+    supabase_tools.supabase_client = client
+    business_tools.supabase_client = client
+    supabase_tools._async_supabase_client = async_client
+
+
+class LatencyAsyncEngine:
+    """
+    Envolve uma AsyncEngine adicionando latência de rede simulada (com
+    `asyncio.sleep`) a cada comando, sem bloquear o event loop.
+    """
+
+    def __init__(self, engine, latency: Callable[[], float]):
+        self._engine = engine
+        self._latency = latency
+
+    def connect(self) -> "_LatencyAsyncConnection":
+        return _LatencyAsyncConnection(self._engine.connect(), self._latency)
+
+    def begin(self) -> "_LatencyAsyncConnection":
+        return _LatencyAsyncConnection(self._engine.begin(), self._latency)
+
+
+class _LatencyAsyncConnection:
+    def __init__(self, connect_ctx, latency: Callable[[], float]):
+        self._ctx = connect_ctx
+        self._latency = latency
+        self._conn = None
+
+    async def __aenter__(self) -> "_LatencyAsyncConnection":
+        self._conn = await self._ctx.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self._ctx.__aexit__(*exc)
+
+    async def execute(self, *args: Any, **kwargs: Any):
+        await asyncio.sleep(self._latency())
+        return await self._conn.execute(*args, **kwargs)
+
+    async def stream(self, *args: Any, **kwargs: Any):
+        await asyncio.sleep(self._latency())
+        return await self._conn.stream(*args, **kwargs)
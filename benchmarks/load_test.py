@@ -0,0 +1,455 @@
+# benchmarks/load_test.py
+# Gerador de carga concorrente para o pipeline conversacional. Simula muitos
+# usuários de WhatsApp (thread_ids distintos, intenções de leitura e escrita
+# misturadas) sobre o grafo real, com LLM e banco falsos de latência configurável.
+#
+# Modos:
+#   closed: N usuários, cada um envia a próxima mensagem só depois da resposta
+#           (mais um tempo de "digitação"). Mede a capacidade com carga fixa.
+#   open:   mensagens chegam a uma taxa fixa (processo de Poisson), independente
+#           das respostas, e são atendidas por um pool de `--workers` threads.
+#           Mede o tempo de fila quando a taxa passa da capacidade.
+#
+# Com --async, o grafo roda via `astream` em um único event loop (usuários viram
+# tasks e o pool de workers vira um semáforo), para comparar CPU e threads por
+# usuário com o caminho síncrono.
+#
+# Uso:
+#   python -m benchmarks.load_test closed --sweep 1,4,16,32 --turns 5 --llm-latency lognormal:-0.7,0.5
+#   python -m benchmarks.load_test closed --sweep 1,4,16,32 --async
+#   python -m benchmarks.load_test open --sweep 2,5,10 --duration 30 --workers 16 --llm-latency fixed:0.4
+
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from .corpus import build_corpus
+from .fakes import TurnScript
+from .run_benchmark import abench_pipeline, arun_turn, bench_pipeline, git_commit, run_turn, summarize
+
+
+def parse_distribution(spec: str) -> Optional[Callable[[], float]]:
+    """
+    Converte uma especificação textual em um gerador de latências (segundos).
+
+    Formatos: `0` (sem latência), `fixed:S`, `uniform:A,B`, `exp:MEDIA`,
+    `lognormal:MU,SIGMA` (parâmetros da normal subjacente).
+    """
+    if spec in ("", "0", "none"):
+        return None
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",")] if params else []
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "exp":
+        return lambda: random.expovariate(1 / values[0])
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(values[0], values[1])
+    raise ValueError(f"Distribuição de latência desconhecida: {spec!r}")
+
+
+@dataclass
+class TurnSample:
+    """Tempos (perf_counter) de um turno: chegada, início do atendimento e fim."""
+    kind: str
+    arrival: float
+    start: float
+    end: float
+    error: Optional[str] = None
+
+    @property
+    def queue_ms(self) -> float:
+        return (self.start - self.arrival) * 1000
+
+    @property
+    def service_ms(self) -> float:
+        return (self.end - self.start) * 1000
+
+    @property
+    def latency_ms(self) -> float:
+        return (self.end - self.arrival) * 1000
+
+
+def _rss_mb() -> Optional[float]:
+    """Memória residente atual do processo (MB), lida de /proc (só Linux)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+
+
+class SaturationMonitor:
+    """Amostra periodicamente threads ativas, conexões do pool e chamadas ao LLM em andamento."""
+
+    def __init__(self, pipeline, interval: float = 0.05):
+        self._pipeline = pipeline
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self.samples: Dict[str, List[int]] = defaultdict(list)
+
+    def _pools(self) -> list:
+        engines = [self._pipeline.engine]
+        if self._pipeline.async_engine is not None:
+            engines.append(self._pipeline.async_engine.sync_engine)
+        return [engine.pool for engine in engines if hasattr(engine.pool, "checkedout")]
+
+    def _run(self) -> None:
+        pools = self._pools()
+        while not self._stop.is_set():
+            self.samples["threads"].append(threading.active_count())
+            if pools:
+                self.samples["db_connections"].append(sum(pool.checkedout() for pool in pools))
+            self.samples["llm_in_flight"].append(self._pipeline.llm.stats.in_flight)
+            rss = _rss_mb()
+            if rss is not None:
+                self.samples["rss_mb"].append(rss)
+            self._stop.wait(self._interval)
+
+    def __enter__(self) -> "SaturationMonitor":
+        self._pipeline.llm.stats.reset_peak()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def report(self) -> Dict[str, Any]:
+        out = {
+            name: {"peak": max(values), "mean": round(sum(values) / len(values), 2)}
+            for name, values in self.samples.items() if values
+        }
+        # O pico exato vem do contador do modelo, não da amostragem.
+        out.setdefault("llm_in_flight", {})["peak"] = self._pipeline.llm.stats.peak_in_flight
+        sizes = [pool.size() for pool in self._pools() if hasattr(pool, "size")]
+        if sizes:
+            out["db_pool_size"] = sum(sizes)
+        return out
+
+
+class IntentMixer:
+    """Sorteia o próximo comando respeitando a proporção de escritas."""
+
+    def __init__(self, corpus: List[TurnScript], write_ratio: float, seed: Optional[int] = None):
+        self._reads = [s for s in corpus if s.kind == "read"]
+        self._writes = [s for s in corpus if s.kind == "write"]
+        self._write_ratio = write_ratio
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def next(self) -> TurnScript:
+        with self._lock:
+            pool = self._writes if self._rng.random() < self._write_ratio else self._reads
+            return self._rng.choice(pool)
+
+
+def _timed_turn(pipeline, thread_id: str, script: TurnScript, arrival: float,
+                deadline: Optional[float], lock: Optional[threading.Lock] = None) -> TurnSample:
+    # Mensagens do mesmo usuário são processadas em ordem: a espera pelo lock
+    # da conversa conta como tempo de fila.
+    if lock:
+        lock.acquire()
+    try:
+        start = time.perf_counter()
+        error = None
+        try:
+            run_turn(pipeline, thread_id, script.command, deadline)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        return TurnSample(script.kind, arrival, start, time.perf_counter(), error)
+    finally:
+        if lock:
+            lock.release()
+
+
+def run_closed_loop(pipeline, mixer: IntentMixer, users: int, turns: int,
+                    think_time: Optional[Callable[[], float]], deadline: Optional[float]) -> List[TurnSample]:
+    """Cada usuário virtual roda em sua própria thread, como cada requisição no design síncrono atual."""
+    samples: List[TurnSample] = []
+    samples_lock = threading.Lock()
+
+    def user_loop():
+        thread_id = str(uuid.uuid4())
+        for _ in range(turns):
+            sample = _timed_turn(pipeline, thread_id, mixer.next(), time.perf_counter(), deadline)
+            with samples_lock:
+                samples.append(sample)
+            if think_time:
+                time.sleep(think_time())
+
+    threads = [threading.Thread(target=user_loop, name=f"user-{i}") for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def run_open_loop(pipeline, mixer: IntentMixer, rate: float, duration: float, workers: int,
+                  users: int, deadline: Optional[float], seed: Optional[int] = None) -> List[TurnSample]:
+    """Chegadas de Poisson a `rate` mensagens/s, distribuídas entre `users` conversas."""
+    rng = random.Random(seed)
+    thread_ids = [str(uuid.uuid4()) for _ in range(users)]
+    locks = {thread_id: threading.Lock() for thread_id in thread_ids}
+    futures = []
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="worker") as executor:
+        start = time.perf_counter()
+        next_arrival = start
+        while next_arrival < start + duration:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            thread_id = rng.choice(thread_ids)
+            futures.append(executor.submit(
+                _timed_turn, pipeline, thread_id, mixer.next(), next_arrival, deadline, locks[thread_id],
+            ))
+            next_arrival += rng.expovariate(rate)
+    return [future.result() for future in futures]
+
+
+async def _atimed_turn(pipeline, thread_id: str, script: TurnScript, arrival: float, deadline: Optional[float],
+                       lock: Optional[asyncio.Lock] = None, slots: Optional[asyncio.Semaphore] = None) -> TurnSample:
+    # Equivalente assíncrono de _timed_turn: o semáforo faz o papel do pool de workers.
+    async with lock or nullcontext(), slots or nullcontext():
+        start = time.perf_counter()
+        error = None
+        try:
+            await arun_turn(pipeline, thread_id, script.command, deadline)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        return TurnSample(script.kind, arrival, start, time.perf_counter(), error)
+
+
+async def arun_closed_loop(pipeline, mixer: IntentMixer, users: int, turns: int,
+                           think_time: Optional[Callable[[], float]], deadline: Optional[float]) -> List[TurnSample]:
+    """Cada usuário virtual é uma task no mesmo event loop."""
+    samples: List[TurnSample] = []
+
+    async def user_loop():
+        thread_id = str(uuid.uuid4())
+        for _ in range(turns):
+            samples.append(await _atimed_turn(pipeline, thread_id, mixer.next(), time.perf_counter(), deadline))
+            if think_time:
+                await asyncio.sleep(think_time())
+
+    await asyncio.gather(*(user_loop() for _ in range(users)))
+    return samples
+
+
+async def arun_open_loop(pipeline, mixer: IntentMixer, rate: float, duration: float, workers: int,
+                         users: int, deadline: Optional[float], seed: Optional[int] = None) -> List[TurnSample]:
+    """Chegadas de Poisson atendidas por no máximo `workers` turnos simultâneos."""
+    rng = random.Random(seed)
+    thread_ids = [str(uuid.uuid4()) for _ in range(users)]
+    locks = {thread_id: asyncio.Lock() for thread_id in thread_ids}
+    slots = asyncio.Semaphore(workers)
+    tasks = []
+
+    start = time.perf_counter()
+    next_arrival = start
+    while next_arrival < start + duration:
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        thread_id = rng.choice(thread_ids)
+        tasks.append(asyncio.create_task(_atimed_turn(
+            pipeline, thread_id, mixer.next(), next_arrival, deadline, locks[thread_id], slots,
+        )))
+        next_arrival += rng.expovariate(rate)
+    return list(await asyncio.gather(*tasks))
+
+
+def summarize_samples(samples: List[TurnSample], wall_seconds: float) -> Dict[str, Any]:
+    ok = [s for s in samples if s.error is None]
+    by_kind = {}
+    for kind in sorted({s.kind for s in ok}):
+        by_kind[kind] = summarize([s.latency_ms for s in ok if s.kind == kind])
+    errors = [s.error for s in samples if s.error]
+    return {
+        "completed": len(ok),
+        "errors": len(errors),
+        "error_examples": sorted(set(errors))[:5],
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(len(ok) / wall_seconds, 3) if wall_seconds else 0.0,
+        "latency_ms": summarize([s.latency_ms for s in ok]),
+        "service_ms": summarize([s.service_ms for s in ok]),
+        "queue_ms": summarize([s.queue_ms for s in ok]),
+        "latency_ms_by_kind": by_kind,
+    }
+
+
+def _level_result(mode: str, level: float, samples: List[TurnSample], wall: float, cpu: float,
+                  monitor: SaturationMonitor, sessions=None) -> Dict[str, Any]:
+    result = {"level": level, **summarize_samples(samples, wall), "saturation": monitor.report()}
+    result["cpu"] = {
+        "seconds": round(cpu, 3),
+        "ms_per_turn": round(cpu * 1000 / result["completed"], 3) if result["completed"] else 0.0,
+        "utilization": round(cpu / wall, 3) if wall else 0.0,
+    }
+    if mode == "closed":
+        result["saturation"]["threads_per_user"] = round(result["saturation"]["threads"]["peak"] / level, 2)
+    if sessions is not None:
+        result["sessions"] = sessions.stats()
+    print(
+        f"[{mode}] nível={level}: {result['throughput_rps']} turnos/s, "
+        f"p50={result['latency_ms']['p50']:.0f}ms p99={result['latency_ms']['p99']:.0f}ms, "
+        f"fila p95={result['queue_ms']['p95']:.0f}ms, CPU/turno={result['cpu']['ms_per_turn']:.1f}ms, "
+        f"threads={result['saturation']['threads']['peak']}, erros={result['errors']}",
+        file=sys.stderr,
+    )
+    return result
+
+
+def run_load_test(mode: str, levels: List[float], *, turns: int = 5, duration: float = 20.0,
+                  workers: int = 16, users: int = 50, write_ratio: float = 0.3,
+                  think_time: Optional[Callable[[], float]] = None, deadline: Optional[float] = None,
+                  seed: Optional[int] = 42, async_mode: bool = False, **pipeline_kwargs) -> List[Dict[str, Any]]:
+    """
+    Executa um nível de carga por item de `levels` (usuários no modo closed,
+    mensagens/s no modo open) sobre o mesmo pipeline e devolve um resultado por nível.
+    """
+    if async_mode:
+        return asyncio.run(_arun_load_test(
+            mode, levels, turns=turns, duration=duration, workers=workers, users=users,
+            write_ratio=write_ratio, think_time=think_time, deadline=deadline, seed=seed, **pipeline_kwargs,
+        ))
+
+    results = []
+    with bench_pipeline(**pipeline_kwargs) as pipeline:
+        mixer = IntentMixer(build_corpus(), write_ratio, seed)
+        for level in levels:
+            with SaturationMonitor(pipeline) as monitor:
+                start, cpu_start = time.perf_counter(), time.process_time()
+                if mode == "closed":
+                    samples = run_closed_loop(pipeline, mixer, int(level), turns, think_time, deadline)
+                else:
+                    samples = run_open_loop(pipeline, mixer, level, duration, workers, users, deadline, seed)
+                wall, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+            results.append(_level_result(mode, level, samples, wall, cpu, monitor))
+    return results
+
+
+async def _arun_load_test(mode: str, levels: List[float], *, turns: int, duration: float, workers: int,
+                          users: int, write_ratio: float, think_time: Optional[Callable[[], float]],
+                          deadline: Optional[float], seed: Optional[int], **pipeline_kwargs) -> List[Dict[str, Any]]:
+    results = []
+    async with abench_pipeline(**pipeline_kwargs) as pipeline:
+        mixer = IntentMixer(build_corpus(), write_ratio, seed)
+        for level in levels:
+            with SaturationMonitor(pipeline) as monitor:
+                start, cpu_start = time.perf_counter(), time.process_time()
+                if mode == "closed":
+                    samples = await arun_closed_loop(pipeline, mixer, int(level), turns, think_time, deadline)
+                else:
+                    samples = await arun_open_loop(pipeline, mixer, level, duration, workers, users, deadline, seed)
+                wall, cpu = time.perf_counter() - start, time.process_time() - cpu_start
+            results.append(_level_result(mode, level, samples, wall, cpu, monitor, pipeline.sessions))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerador de carga concorrente para o pipeline conversacional.")
+    parser.add_argument("mode", choices=["closed", "open"])
+    parser.add_argument("--sweep", default="1,4,16",
+                        help="Níveis de carga separados por vírgula: usuários (closed) ou mensagens/s (open).")
+    parser.add_argument("--turns", type=int, default=5, help="[closed] Turnos por usuário.")
+    parser.add_argument("--think-time", default="0", help="[closed] Distribuição do intervalo entre mensagens.")
+    parser.add_argument("--duration", type=float, default=20.0, help="[open] Duração de cada nível (s).")
+    parser.add_argument("--workers", type=int, default=16, help="[open] Threads que atendem as mensagens.")
+    parser.add_argument("--users", type=int, default=50, help="[open] Conversas distintas que recebem as mensagens.")
+    parser.add_argument("--write-ratio", type=float, default=0.3, help="Fração de comandos de escrita.")
+    parser.add_argument("--llm-latency", default="fixed:0.3", help="Distribuição de latência do LLM falso.")
+    parser.add_argument("--db-latency", default="fixed:0.005", help="Distribuição de latência por comando SQL.")
+    parser.add_argument("--deadline", type=float, default=None, help="Orçamento de tempo por turno (s).")
+    parser.add_argument("--db-url", default=None,
+                        help="URL SQLAlchemy do banco (padrão: SQLite temporário em arquivo, com pool de conexões).")
+    parser.add_argument("--scale", type=float, default=0.2, help="Multiplicador dos volumes semeados.")
+    parser.add_argument("--no-resilience", action="store_true", help="Usa o LLM sem o ResilientChatModel.")
+    parser.add_argument("--async", dest="async_mode", action="store_true",
+                        help="Roda o grafo via astream em um único event loop.")
+    parser.add_argument("--max-sessions", type=int, default=None,
+                        help="[async] Usa o SessionManager com no máximo N sessões em memória.")
+    parser.add_argument("--max-session-mb", type=float, default=256.0,
+                        help="[async] Memória máxima das sessões (MB), com --max-sessions.")
+    parser.add_argument("--session-idle", type=float, default=0.0,
+                        help="[async] Despeja sessões ociosas há mais de N segundos (0 desativa).")
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: stdout).")
+    args = parser.parse_args()
+    if args.max_sessions is not None and not args.async_mode:
+        parser.error("--max-sessions requer --async.")
+
+    # As ferramentas da aplicação registram cada inserção em nível INFO, o que
+    # distorce a medição sob carga.
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+    db_url, tmp_path = args.db_url, None
+    if db_url is None:
+        fd, tmp_path = tempfile.mkstemp(suffix=".db", prefix="atlas_load_")
+        os.close(fd)
+        db_url = f"sqlite:///{tmp_path}"
+
+    try:
+        results = run_load_test(
+            args.mode,
+            [float(level) for level in args.sweep.split(",")],
+            turns=args.turns,
+            duration=args.duration,
+            workers=args.workers,
+            users=args.users,
+            write_ratio=args.write_ratio,
+            think_time=parse_distribution(args.think_time),
+            deadline=args.deadline,
+            db_url=db_url,
+            scale=args.scale,
+            latency=parse_distribution(args.llm_latency),
+            db_latency=parse_distribution(args.db_latency),
+            resilient=not args.no_resilience,
+            async_mode=args.async_mode,
+            **({"sessions": {
+                "max_sessions": args.max_sessions,
+                "max_memory_bytes": int(args.max_session_mb * 1024 * 1024),
+                "idle_seconds": args.session_idle,
+            }} if args.max_sessions is not None else {}),
+        )
+    finally:
+        if tmp_path:
+            os.remove(tmp_path)
+
+    report = {
+        "benchmark": f"load_{args.mode}",
+        "git_commit": git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "levels": results,
+    }
+    payload = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(payload)
+        print(f"Resultados salvos em {args.output}", file=sys.stderr)
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
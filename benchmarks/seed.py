@@ -0,0 +1,187 @@
+# benchmarks/seed.py
+# Esquema e dados sintéticos (vendas / custos / abates) para os benchmarks.
+# Funciona tanto com SQLite quanto com um Postgres local, via SQLAlchemy.
+
+import random
+from datetime import date, timedelta
+from typing import Dict
+
+from sqlalchemy import (
+    Column, Date, Integer, MetaData, Numeric, String, Table, Text, create_engine,
+)
+from sqlalchemy.engine import Engine
+
+metadata = MetaData()
+
+# As tabelas espelham os modelos CustoInput / VendaInput / AbateInput de app/tools/business_models.py.
+custos = Table(
+    "custos", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("data", Date, nullable=False),
+    Column("descricao", Text, nullable=False),
+    Column("total", Numeric(12, 2, asdecimal=False), nullable=False),
+    Column("classe", String(60)),
+    Column("categoria", String(60)),
+    Column("sub_categoria", String(60)),
+    Column("quantidade", Numeric(12, 3, asdecimal=False)),
+    Column("preco_unitario", Numeric(12, 2, asdecimal=False)),
+    Column("beneficiario", String(120)),
+    Column("forma_pagamento", String(40)),
+    Column("lote", String(20)),
+    Column("observacoes", Text),
+)
+
+vendas = Table(
+    "vendas", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("data", Date, nullable=False),
+    Column("cliente", String(120), nullable=False),
+    Column("estabelecimento", String(120), nullable=False, default=""),
+    Column("produto", String(20), nullable=False),
+    Column("tipo_produto", String(20), nullable=False),
+    Column("quantidade_kg", Numeric(12, 3, asdecimal=False), nullable=False),
+    Column("preco_por_kg", Numeric(12, 2, asdecimal=False), nullable=False),
+    Column("total", Numeric(12, 2, asdecimal=False), nullable=False),
+    Column("status_venda", String(20), nullable=False),
+    Column("lote", String(20), nullable=False),
+    Column("forma_pagamento", String(40)),
+    Column("observacao", Text),
+)
+
+abates = Table(
+    "abates", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("data", Date, nullable=False),
+    Column("especie", String(40), nullable=False),
+    Column("lote", String(20), nullable=False),
+    Column("quantidade_peixes", Integer, nullable=False),
+    Column("quantidade_kg", Numeric(12, 3, asdecimal=False), nullable=False),
+    Column("tanque_gaiola", String(40), nullable=False),
+    Column("peso_medio", Numeric(8, 3, asdecimal=False), nullable=False),
+    Column("status", String(40)),
+    Column("observacao", Text),
+)
+
+# Volumes padrão, próximos de alguns anos de operação.
+DEFAULT_VOLUMES: Dict[str, int] = {"vendas": 50_000, "custos": 20_000, "abates": 5_000}
+
+CLIENTES = [
+    "Mercado Central", "Peixaria do João", "Restaurante Sabor do Rio", "Dona Maria",
+    "Supermercado Bom Preço", "Bar do Zé", "Hotel Pantanal", "Feira Livre", "Cliente Avulso",
+]
+CATEGORIAS = {
+    "Transporte": ["combustivel", "manutencao", "pedagio"],
+    "Ração": ["racao crescimento", "racao engorda"],
+    "Mão de obra": ["diaria", "salario"],
+    "Energia": ["energia eletrica"],
+    "Insumos": ["gelo", "embalagem", "calcario"],
+}
+PAGAMENTOS = ["Dinheiro", "Pix", "Cartão débito", "Boleto"]
+TIPOS_PRODUTO = ["cortado", "inteiro", "cabeça", "retalho"]
+LOTES = [f"L{n:02d}" for n in range(1, 25)]
+
+
+def create_bench_engine(db_url: str = "sqlite://") -> Engine:
+    """
+    Cria a engine do banco de benchmark. O padrão é um SQLite em memória,
+    compartilhado entre threads por uma única conexão. Um SQLite em arquivo
+    usa um pool de conexões, como um Postgres.
+    """
+    if db_url in ("sqlite://", "sqlite:///:memory:"):
+        from sqlalchemy.pool import StaticPool
+        return create_engine(db_url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    if db_url.startswith("sqlite"):
+        return create_engine(db_url, connect_args={"check_same_thread": False})
+    return create_engine(db_url)
+
+
+def _day(rng: random.Random, start: date, span_days: int) -> date:
+    return start + timedelta(days=rng.randrange(span_days))
+
+
+def _venda(rng: random.Random, start: date, span: int) -> dict:
+    kg = round(rng.uniform(2, 300), 3)
+    preco = round(rng.uniform(18, 45), 2)
+    return {
+        "data": _day(rng, start, span),
+        "cliente": rng.choice(CLIENTES),
+        "estabelecimento": rng.choice(["", "Loja 1", "Loja 2", "Centro"]),
+        "produto": rng.choice(["Caranha", "Pintado"]),
+        "tipo_produto": rng.choice(TIPOS_PRODUTO),
+        "quantidade_kg": kg,
+        "preco_por_kg": preco,
+        "total": round(kg * preco, 2),
+        "status_venda": rng.choices(["pago", "pendente", "doacao"], weights=[80, 18, 2])[0],
+        "lote": rng.choice(LOTES),
+        "forma_pagamento": rng.choice(PAGAMENTOS),
+        "observacao": None,
+    }
+
+
+def _custo(rng: random.Random, start: date, span: int) -> dict:
+    categoria = rng.choice(list(CATEGORIAS))
+    sub_categoria = rng.choice(CATEGORIAS[categoria])
+    quantidade = round(rng.uniform(1, 100), 3)
+    preco = round(rng.uniform(5, 400), 2)
+    return {
+        "data": _day(rng, start, span),
+        "descricao": f"{sub_categoria.capitalize()} - {categoria}",
+        "total": round(quantidade * preco, 2),
+        "classe": rng.choice(["custo operacional", "investimento", "Variável", "Fixo"]),
+        "categoria": categoria,
+        "sub_categoria": sub_categoria,
+        "quantidade": quantidade,
+        "preco_unitario": preco,
+        "beneficiario": rng.choice(["Posto Ipiranga", "Agropecuária Central", "Energisa", "Funcionário"]),
+        "forma_pagamento": rng.choice(PAGAMENTOS),
+        "lote": rng.choice(LOTES + [None]),
+        "observacoes": None,
+    }
+
+
+def _abate(rng: random.Random, start: date, span: int) -> dict:
+    peixes = rng.randint(50, 1500)
+    peso_medio = round(rng.uniform(0.8, 3.5), 3)
+    return {
+        "data": _day(rng, start, span),
+        "especie": rng.choice(["Pintado", "Caranha"]),
+        "lote": rng.choice(LOTES),
+        "quantidade_peixes": peixes,
+        "quantidade_kg": round(peixes * peso_medio, 3),
+        "tanque_gaiola": f"Tanque {rng.randint(1, 12)}",
+        "peso_medio": peso_medio,
+        "status": rng.choice(["concluido", "em processamento"]),
+        "observacao": None,
+    }
+
+
+def seed_database(engine: Engine, scale: float = 1.0, years: int = 3, seed: int = 42,
+                  batch_size: int = 5_000) -> Dict[str, int]:
+    """
+    Cria as tabelas (se necessário) e insere dados sintéticos realistas.
+
+    Args:
+        engine (Engine): A engine de destino.
+        scale (float): Multiplicador dos volumes em DEFAULT_VOLUMES.
+        years (int): Quantos anos de histórico (até hoje) gerar.
+        seed (int): Semente do gerador, para resultados reprodutíveis entre execuções.
+        batch_size (int): Tamanho de cada lote de inserção.
+
+    Returns:
+        Dict[str, int]: Número de linhas inseridas por tabela.
+    """
+    metadata.create_all(engine)
+    rng = random.Random(seed)
+    span = 365 * years
+    start = date.today() - timedelta(days=span)
+    generators = {"vendas": (vendas, _venda), "custos": (custos, _custo), "abates": (abates, _abate)}
+
+    counts = {}
+    with engine.begin() as conn:
+        for name, (table, make_row) in generators.items():
+            total = int(DEFAULT_VOLUMES[name] * scale)
+            for offset in range(0, total, batch_size):
+                rows = [make_row(rng, start, span) for _ in range(min(batch_size, total - offset))]
+                conn.execute(table.insert(), rows)
+            counts[name] = total
+    return counts
@@ -0,0 +1,103 @@
+# import_data.py
+# Importação em massa de planilhas históricas (CSV/XLSX) para custos, vendas ou abates.
+#
+# Uso:
+#   python import_data.py vendas historico_vendas.xlsx
+#   python import_data.py custos custos_2022.csv --map "Valor Pago=total" --map "Obs=observacoes"
+#   python import_data.py abates abates.csv --dry-run   # só valida, sem gravar
+#   python import_data.py abates abates_en.csv --decimal .   # números como 1,234.56
+
+import argparse
+import json
+import sys
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.tools.import_tools import DECIMAL_SEPARATORS, MODELS, ImportReport, import_file
+
+
+def print_progress(report: ImportReport) -> None:
+    print(
+        f"[{report.table}] {report.rows_read:,} linhas lidas | {report.rows_valid:,} válidas | "
+        f"{report.rows_rejected:,} rejeitadas | {report.rows_per_second:,.0f} linhas/s",
+        file=sys.stderr,
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Importa uma planilha CSV/XLSX para o banco.")
+    parser.add_argument("table", choices=list(MODELS), help="Tabela de destino.")
+    parser.add_argument("file", help="Planilha CSV ou XLSX.")
+    parser.add_argument("--map", action="append", default=[], metavar="COLUNA=CAMPO",
+                        help="Associa uma coluna da planilha a um campo do modelo (pode repetir).")
+    parser.add_argument("--sheet", help="Aba do XLSX (padrão: a aba ativa).")
+    parser.add_argument("--delimiter", help="Separador do CSV (padrão: detectado automaticamente).")
+    parser.add_argument("--encoding", default="utf-8-sig", help="Codificação do CSV.")
+    parser.add_argument("--decimal", choices=DECIMAL_SEPARATORS, default=",",
+                        help="Separador decimal dos números (padrão: ',', como em 1.234,56).")
+    parser.add_argument("--batch-size", type=int, default=5_000, help="Linhas por lote.")
+    parser.add_argument("--rejects", help="Arquivo de linhas rejeitadas (padrão: <arquivo>.rejeitados.csv).")
+    parser.add_argument("--dry-run", action="store_true", help="Só valida a planilha, sem gravar no banco.")
+    parser.add_argument("--db-url", help="URL do banco (padrão: DATABASE_URL do .env).")
+    parser.add_argument("--report", help="Salva o relatório final em JSON neste arquivo.")
+    args = parser.parse_args()
+
+    column_map = {}
+    for item in args.map:
+        column, sep, field_name = item.rpartition("=")
+        if not sep or not column:
+            parser.error(f"Mapeamento inválido: {item!r}. Use COLUNA=CAMPO.")
+        column_map[column] = field_name.strip()
+
+    engine = None
+    if not args.dry_run:
+        if args.db_url:
+            db_url = args.db_url
+        else:
+            from app.core.config import DATABASE_URL
+            db_url = DATABASE_URL
+        engine = create_engine(db_url)
+
+    try:
+        report = import_file(
+            engine, args.table, args.file,
+            column_map=column_map,
+            sheet=args.sheet,
+            delimiter=args.delimiter,
+            encoding=args.encoding,
+            decimal=args.decimal,
+            batch_size=args.batch_size,
+            reject_path=args.rejects,
+            dry_run=args.dry_run,
+            progress=print_progress,
+        )
+    except (ValueError, FileNotFoundError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    except SQLAlchemyError as e:
+        # A importação roda numa única transação: nada foi gravado.
+        cause = getattr(e, "orig", None) or e
+        print(f"Erro: falha no banco de dados, nenhuma linha foi importada. {cause}", file=sys.stderr)
+        return 1
+    finally:
+        if engine is not None:
+            engine.dispose()
+
+    print(
+        f"\n✅ Importação concluída em {report.seconds:.1f}s ({report.rows_per_second:,.0f} linhas/s).\n"
+        f"   Lidas: {report.rows_read:,} | Inseridas: {report.rows_inserted:,} | "
+        f"Duplicadas: {report.rows_duplicated:,} | Rejeitadas: {report.rows_rejected:,}"
+    )
+    if report.unmapped_columns:
+        print(f"   Colunas ignoradas: {', '.join(report.unmapped_columns)}")
+    if report.reject_file:
+        print(f"   Linhas rejeitadas (com o motivo) em: {report.reject_file}")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,27 @@
 # main.py
 # Ponto de entrada principal da aplicação que monta e executa o Agente Orquestrador com LangGraph.
 
+import asyncio
 import datetime
+import os
+import sys
+import threading
 import uuid
 
 from langchain_core.messages import HumanMessage
 from langchain_openai import ChatOpenAI 
-from langgraph.checkpoint.sqlite import SqliteSaver # Para persistência do estado do grafo
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver # Para persistência do estado do grafo
 
 # Importa os componentes de configuração e ferramentas
-from app.core.config import OPENAI_API_KEY
-from app.tools.supabase_tools import get_database_connection
+from app.core.config import (
+    OPENAI_API_KEY, LLM_TURN_DEADLINE_SECONDS, LLM_HEDGE_PERCENTILE, LLM_HEDGE_INITIAL_DELAY,
+    SESSION_DB_PATH, SESSION_MAX_ACTIVE, SESSION_MAX_MEMORY_MB, SESSION_IDLE_SECONDS
+)
+from app.core.resilience import ResilientChatModel, deadline_scope
+from app.core.sessions import SessionManager
+from app.tools.supabase_tools import get_database_connection, get_async_database_engine
+from app.tools.export_tools import find_export_handles, resolve_export
 
 # Importa os construtores de agentes e do grafo
 from app.agents.sql_agent import create_sql_agent_graph
@@ -18,9 +29,58 @@ from app.agents.report_agent import create_report_chain
 from app.agents.orchestrator_agent import create_orchestrator_agent_runnable
 from app.graph.builder import create_graph_with_persistence
 
-def main():
+def _read_line(prompt: str) -> str:
+    """Lê uma linha do stdin direto do descritor, sem o buffer (e o lock) do sys.stdin."""
+    print(prompt, end="", flush=True)
+    data = bytearray()
+    while not data.endswith(b"\n"):
+        chunk = os.read(sys.stdin.fileno(), 1)
+        if not chunk:
+            if not data:
+                raise EOFError
+            break
+        data += chunk
+    return data.decode(sys.stdin.encoding or "utf-8", errors="replace").rstrip("\r\n")
+
+async def _ainput(prompt: str) -> str:
+    """
+    Lê uma linha do terminal sem bloquear o event loop.
+
+    Usa uma thread daemon em vez de `asyncio.to_thread`: após um Ctrl-C, o
+    `asyncio.run` espera as threads do executor padrão terminarem, e a leitura
+    pendente travaria o encerramento até o usuário apertar Enter.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def deliver(result, error):
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def read():
+        try:
+            result, error = _read_line(prompt), None
+        except Exception as e:  # EOFError (Ctrl-D) é repassado ao loop.
+            result, error = None, e
+        try:
+            loop.call_soon_threadsafe(deliver, result, error)
+        except RuntimeError:  # Event loop já encerrado.
+            pass
+
+    threading.Thread(target=read, name="stdin-reader", daemon=True).start()
+    return await future
+
+async def main():
     """
     Função principal que inicializa todos os componentes e inicia o loop de conversa.
+
+    O grafo roda no modo assíncrono (astream): as ferramentas usam o cliente
+    assíncrono do Supabase e o asyncpg, e chamadas independentes de um mesmo
+    passo são executadas concorrentemente no event loop.
     """
     print("--- Iniciando o Agente Financeiro Proativo com LangGraph ---")
 
@@ -29,13 +89,22 @@ def main():
     print(f"ID da Conversa (Thread ID): {thread_id}")
 
     # 1. Inicializa o LLM
-    llm = ChatOpenAI(model="gpt-4.1-mini", temperature=0, api_key=OPENAI_API_KEY)
-    print(f"Usando o modelo: {llm.model_name}")
+    # O ResilientChatModel adiciona deadline por turno e requisições duplicadas (hedge)
+    # para cortar a latência de cauda. Para testes locais, aponte OPENAI_BASE_URL
+    # para o servidor falso em benchmarks/fake_llm_server.py.
+    base_llm = ChatOpenAI(model="gpt-4.1-mini", temperature=0, api_key=OPENAI_API_KEY)
+    llm = ResilientChatModel(
+        inner=base_llm,
+        hedge_percentile=LLM_HEDGE_PERCENTILE,
+        hedge_initial_delay=LLM_HEDGE_INITIAL_DELAY,
+    )
+    print(f"Usando o modelo: {base_llm.model_name}")
 
     # 2. Inicializa as ferramentas e sub-agentes
     try:
         db_connection = get_database_connection()
-        sql_agent = create_sql_agent_graph(llm=llm, db=db_connection)
+        async_engine = get_async_database_engine()
+        sql_agent = create_sql_agent_graph(llm=llm, db=db_connection, async_engine=async_engine)
         report_chain = create_report_chain(llm=llm)
     except Exception as e:
         print(f"Erro durante a inicialização dos componentes: {e}")
@@ -49,52 +118,80 @@ def main():
     )
 
     # 4. Configura a persistência (checkpointer) e compila o grafo
-    # Usando SQLite em memória para simplicidade. O bloco `with` gerencia a conexão.
-    with SqliteSaver.from_conn_string(":memory:") as checkpointer:
-        # 5. Cria e compila o grafo com a persistência
-        graph = create_graph_with_persistence(agent_runnable, tools, checkpointer)
-
-        print("\n🤖 Agente Orquestrador (LangGraph) pronto. Você pode começar a conversar.")
-        print("Para sair, digite 'sair' ou 'exit'.")
-
-        # 6. Loop Conversacional com o Grafo
-        while True:
-            try:
-                user_query = input("\nSua pergunta: ")
-                if user_query.lower() in ["sair", "exit"]:
-                    print("Encerrando a conversa. Até mais!")
-                    break
-
-                # Define a data atual para o contexto do agente
-                current_date = datetime.date.today().strftime("%Y-%m-%d")
-
-                # Define a entrada para o grafo
-                inputs = {
-                    "input": user_query, # Adiciona a chave 'input'
-                    "messages": [HumanMessage(content=user_query)],
-                    "current_date": current_date,
-                    "intermediate_steps": []
-                }
-                
-                # Configuração para a execução do grafo, especificando o ID da thread
-                config = {"configurable": {"thread_id": thread_id}}
-
-                # Executa o grafo e faz o stream da resposta
-                final_response = None
-                print("\nResposta:")
-                for event in graph.stream(inputs, config, stream_mode="values"):
-                    # O `stream` retorna o estado completo do grafo a cada passo.
-                    # A resposta final estará na última mensagem.
-                    final_response = event["messages"][-1]
-                
-                if final_response:
-                    print(final_response.content)
-
-            except KeyboardInterrupt:
-                print("\nExecução interrompida pelo usuário. Encerrando...")
-                break
-            except Exception as e:
-                print(f"Ocorreu um erro durante a execução: {e}")
+    # As conversas ativas ficam em memória; o SessionManager limita quantas (e
+    # quanta memória) e despeja as menos usadas para o SQLite em arquivo, de onde
+    # são recarregadas na próxima mensagem. O bloco `async with` gerencia a conexão.
+    try:
+        async with AsyncSqliteSaver.from_conn_string(SESSION_DB_PATH) as durable:
+            # 5. Cria e compila o grafo com a persistência
+            graph = create_graph_with_persistence(agent_runnable, tools, InMemorySaver())
+            # Ao sair do bloco (inclusive por erro ou Ctrl-C), as sessões em memória
+            # são gravadas no SQLite.
+            async with SessionManager(
+                graph,
+                durable,
+                max_sessions=SESSION_MAX_ACTIVE,
+                max_memory_bytes=int(SESSION_MAX_MEMORY_MB * 1024 * 1024),
+                idle_seconds=SESSION_IDLE_SECONDS,
+            ) as sessions:
+                print("\n🤖 Agente Orquestrador (LangGraph) pronto. Você pode começar a conversar.")
+                print("Para sair, digite 'sair' ou 'exit'.")
+
+                # 6. Loop Conversacional com o Grafo
+                while True:
+                    try:
+                        user_query = await _ainput("\nSua pergunta: ")
+                        if user_query.lower() in ["sair", "exit"]:
+                            print("Encerrando a conversa. Até mais!")
+                            break
+
+                        # Define a data atual para o contexto do agente
+                        current_date = datetime.date.today().strftime("%Y-%m-%d")
+
+                        # Define a entrada para o grafo
+                        inputs = {
+                            "input": user_query, # Adiciona a chave 'input'
+                            "messages": [HumanMessage(content=user_query)],
+                            "current_date": current_date,
+                            "intermediate_steps": []
+                        }
+
+                        # Executa o grafo e faz o stream da resposta.
+                        # O deadline do turno é propagado para todas as chamadas aninhadas ao LLM.
+                        final_response = None
+                        print("\nResposta:")
+                        # `sessions.stream` libera a sessão ao sair do bloco, mesmo se o turno falhar.
+                        with deadline_scope(LLM_TURN_DEADLINE_SECONDS):
+                            async with sessions.stream(thread_id, inputs) as events:
+                                async for event in events:
+                                    # O stream retorna o estado completo do grafo a cada passo.
+                                    # A resposta final estará na última mensagem.
+                                    final_response = event["messages"][-1]
+
+                        if final_response:
+                            print(final_response.content)
+                            # Resultados grandes são salvos em arquivo; a integração com o
+                            # WhatsApp envia esses arquivos como documento.
+                            for handle in find_export_handles(final_response.content):
+                                try:
+                                    print(f"📎 Arquivo: {resolve_export(handle)}")
+                                except (ValueError, FileNotFoundError) as e:
+                                    print(e)
+
+                    # Sob asyncio.run, o Ctrl-C cancela a tarefa principal: chega aqui como
+                    # CancelledError no `await` em andamento, não como KeyboardInterrupt.
+                    except (KeyboardInterrupt, asyncio.CancelledError, EOFError):
+                        print("\nExecução interrompida pelo usuário. Encerrando...")
+                        break
+                    except Exception as e:
+                        print(f"Ocorreu um erro durante a execução: {e}")
+
+            stats = sessions.stats()
+            print(f"Sessões gravadas em {SESSION_DB_PATH} (despejos: {stats['evictions']}, recargas: {stats['rehydrations']}).")
+    finally:
+        # Fecha as conexões do pool assíncrono (asyncpg) antes do fim do event loop,
+        # inclusive quando o encerramento vem de uma exceção.
+        await async_engine.dispose()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,8 @@
+# tests/conftest.py
+import os
+
+from benchmarks.run_benchmark import BENCH_ENV
+
+# Valores fictícios para que app.core.config possa ser importado sem um .env real.
+for key, value in BENCH_ENV.items():
+    os.environ.setdefault(key, value)
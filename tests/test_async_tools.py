@@ -0,0 +1,84 @@
+# tests/test_async_tools.py
+# Testes do caminho assíncrono das ferramentas: versões async, concorrência no grafo
+# e criação única do cliente assíncrono do Supabase.
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.agents import AgentFinish
+from langchain_core.messages import HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.checkpoint.memory import InMemorySaver
+
+from app.graph.builder import create_graph_with_persistence
+from app.tools import business_tools, supabase_tools
+from app.tools.business_tools import business_toolkit
+
+TOOL_LATENCY = 0.2
+
+
+@pytest.mark.parametrize("sync_tool", business_toolkit, ids=lambda t: t.name)
+def test_every_business_tool_has_its_async_version(sync_tool):
+    # Ex.: registrar_custo.coroutine is aregistrar_custo
+    assert sync_tool.coroutine is getattr(business_tools, f"a{sync_tool.name}")
+
+
+def test_independent_tool_calls_overlap_under_ainvoke(monkeypatch):
+    async def slow_insert(table_name, record):
+        await asyncio.sleep(TOOL_LATENCY)
+        return f"Registro inserido em {table_name}."
+
+    monkeypatch.setattr(business_tools, "ainsert_record", slow_insert)
+
+    def agent(state):
+        # Primeiro passo: duas chamadas independentes; depois, encerra o turno.
+        if isinstance(state["messages"][-1], ToolMessage):
+            return AgentFinish(return_values={"output": "Custos registrados."}, log="")
+        return [
+            SimpleNamespace(
+                tool="registrar_custo",
+                tool_input={"custo": {"data": "2024-03-05", "descricao": descricao, "total": total}},
+                tool_call_id=f"call_{i}",
+            )
+            for i, (descricao, total) in enumerate([("Ração", 500.0), ("Combustível", 120.0)])
+        ]
+
+    graph = create_graph_with_persistence(RunnableLambda(agent), business_toolkit, InMemorySaver())
+    inputs = {
+        "input": "Registre os custos",
+        "messages": [HumanMessage(content="Registre os custos")],
+        "current_date": "2024-03-05",
+        "intermediate_steps": [],
+    }
+
+    started = time.monotonic()
+    state = asyncio.run(graph.ainvoke(inputs, {"configurable": {"thread_id": "t1"}}))
+    elapsed = time.monotonic() - started
+
+    tool_messages = [m for m in state["messages"] if isinstance(m, ToolMessage)]
+    assert [m.content for m in tool_messages] == ["Registro inserido em custos."] * 2
+    assert elapsed < 2 * TOOL_LATENCY
+
+
+def test_async_supabase_client_is_created_once(monkeypatch):
+    created = []
+
+    async def fake_acreate_client(url, key):
+        await asyncio.sleep(0.05)
+        created.append(object())
+        return created[-1]
+
+    monkeypatch.setattr(supabase_tools, "acreate_client", fake_acreate_client)
+    monkeypatch.setattr(supabase_tools, "_async_supabase_client", None)
+    # Lock novo: o do módulo ficaria preso ao event loop deste teste.
+    monkeypatch.setattr(supabase_tools, "_async_supabase_lock", asyncio.Lock())
+
+    async def scenario():
+        return await asyncio.gather(*[supabase_tools.get_async_supabase_client() for _ in range(5)])
+
+    clients = asyncio.run(scenario())
+
+    assert len(created) == 1
+    assert all(client is created[0] for client in clients)
@@ -0,0 +1,137 @@
+# tests/test_export_tools.py
+# Testes do resumo de resultados grandes (sql_tools, caminhos síncrono e assíncrono)
+# e da limpeza do EXPORT_DIR.
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+from langchain_community.utilities import SQLDatabase
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.tools.export_tools import ExportWriter, cleanup_exports, resolve_export
+from app.tools.sql_tools import ExportSQLQueryTool, StreamingQuerySQLDatabaseTool
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'vendas.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE vendas (id INTEGER PRIMARY KEY, id_lote INTEGER, cliente TEXT, "
+            "quantidade_kg REAL, preco_por_kg REAL, total REAL)"
+        ))
+        conn.execute(
+            text("INSERT INTO vendas VALUES (:id, :id_lote, :cliente, :kg, :preco, :total)"),
+            [
+                {"id": i, "id_lote": 100 + i % 3, "cliente": f"Cliente {i}", "kg": 10.0, "preco": 20.0 + i, "total": 10.0 * (20.0 + i)}
+                for i in range(1, 21)
+            ],
+        )
+    yield SQLDatabase(engine)
+    engine.dispose()
+
+
+def invoke(tool, args: dict, use_async: bool) -> str:
+    """Roda a ferramenta pelo caminho síncrono ou pelo assíncrono (`_astream`, com aiosqlite)."""
+    if not use_async:
+        return tool.invoke(args)
+
+    async def run():
+        tool.async_engine = create_async_engine(tool.db._engine.url.set(drivername="sqlite+aiosqlite"))
+        try:
+            return await tool.ainvoke(args)
+        finally:
+            await tool.async_engine.dispose()
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_summary_sums_only_quantities_and_amounts(db, tmp_path, use_async):
+    tool = StreamingQuerySQLDatabaseTool(db=db, inline_max_rows=5, export_dir=str(tmp_path / "exports"))
+
+    summary = invoke(tool, {"query": "SELECT id, id_lote, quantidade_kg, preco_por_kg, total FROM vendas"}, use_async)
+
+    assert "Resultado com 20 linhas, grande demais" in summary
+    assert "- quantidade_kg: soma=200.00" in summary
+    assert "- total: soma=" in summary
+    assert "- preco_por_kg: mínimo=21.00, máximo=40.00" in summary
+    assert "- id:" not in summary and "- id_lote:" not in summary
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_small_export_is_not_reported_as_too_large(db, tmp_path, use_async):
+    tool = ExportSQLQueryTool(db=db, export_dir=str(tmp_path / "exports"))
+
+    summary = invoke(tool, {"query": "SELECT cliente, total FROM vendas WHERE id <= 2", "formato": "csv"}, use_async)
+
+    assert "grande demais" not in summary
+    assert summary.startswith("Resultado com 2 linhas salvo em arquivo CSV")
+    handle = summary.split(": ", 1)[1].splitlines()[0]
+    assert resolve_export(handle, str(tmp_path / "exports")).is_file()
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_statement_without_rows(db, tmp_path, use_async):
+    tool = StreamingQuerySQLDatabaseTool(db=db, export_dir=str(tmp_path / "exports"))
+
+    result = invoke(tool, {"query": "UPDATE vendas SET total = 0 WHERE id = 1"}, use_async)
+
+    assert result == ""
+    assert db.run("SELECT total FROM vendas WHERE id = 1") == "[(0.0,)]"
+    assert not (tmp_path / "exports").exists()
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_export_without_rows_creates_no_file(db, tmp_path, use_async):
+    tool = ExportSQLQueryTool(db=db, export_dir=str(tmp_path / "exports"))
+
+    result = invoke(tool, {"query": "DELETE FROM vendas WHERE id > 100", "formato": "csv"}, use_async)
+
+    assert result == "A consulta não retornou linhas; nenhum arquivo foi gerado."
+
+
+def test_xlsx_without_openpyxl_returns_error(db, tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "openpyxl", None)
+    tool = ExportSQLQueryTool(db=db, export_dir=str(tmp_path / "exports"))
+
+    result = tool.invoke({"query": "SELECT cliente FROM vendas", "formato": "xlsx"})
+
+    assert result.startswith("Error:") and "openpyxl" in result
+
+
+def _export(export_dir, rows: int = 1) -> ExportWriter:
+    writer = ExportWriter(["valor"], "csv", str(export_dir))
+    writer.write_rows([[i] for i in range(rows)])
+    return writer
+
+
+def test_cleanup_removes_expired_exports(tmp_path):
+    old = _export(tmp_path).close()
+    past = time.time() - 3 * 3600
+    os.utime(old, (past, past))
+    (tmp_path / "notas.txt").write_text("não é uma exportação")
+
+    removed = cleanup_exports(str(tmp_path), ttl_seconds=3600, max_bytes=0)
+
+    assert removed == 1
+    assert not old.exists()
+    assert (tmp_path / "notas.txt").exists()
+
+
+def test_cleanup_keeps_directory_under_max_size(tmp_path):
+    paths = []
+    for i in range(4):
+        path = _export(tmp_path, rows=1000).close()
+        stamp = time.time() - (10 - i)
+        os.utime(path, (stamp, stamp))
+        paths.append(path)
+    size = paths[0].stat().st_size
+
+    cleanup_exports(str(tmp_path), ttl_seconds=0, max_bytes=int(size * 2.5), keep=paths[0])
+
+    # O arquivo protegido fica; dos demais, saem os mais antigos até caber no limite.
+    assert [p.exists() for p in paths] == [True, False, False, True]
@@ -0,0 +1,175 @@
+# tests/test_import_tools.py
+# Testes da importação em massa de planilhas (app/tools/import_tools.py).
+
+import csv
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+
+from app.tools.import_tools import _Invalid, _to_number, import_file
+from benchmarks.seed import create_bench_engine, metadata
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("R$ 1.500,00", "1500.00"),
+    ("1.234.567,8", "1234567.8"),
+    ("-12.345,6", "-12345.6"),
+    ("1234,5", "1234.5"),
+    ("R$\xa012,90", "12.90"),
+    ("1.5", "1.5"),
+    ("150", "150"),
+])
+def test_to_number_brazilian_formats(raw, expected):
+    assert _to_number(raw) == expected
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("1,234.56", "1234.56"),
+    ("450.500", "450.500"),
+    ("-12,345.6", "-12345.6"),
+    ("150", "150"),
+])
+def test_to_number_decimal_point(raw, expected):
+    assert _to_number(raw, decimal=".") == expected
+
+
+@pytest.mark.parametrize("raw, decimal", [
+    ("1,234.56", ","),
+    ("R$ 1.500", ","),
+    ("450.500", ","),
+    ("1.502", ","),
+    ("1.234.567", ","),
+    ("1.234,56", "."),
+    ("1,500", "."),
+])
+def test_to_number_rejects_ambiguous_format(raw, decimal):
+    assert isinstance(_to_number(raw, decimal=decimal), _Invalid)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_bench_engine(f"sqlite:///{tmp_path / 'atlas.db'}")
+    metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def _write_csv(path: Path, rows: list) -> Path:
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        csv.writer(f, delimiter=";").writerows(rows)
+    return path
+
+
+VENDAS_HEADER = ["Data", "Cliente", "Produto", "Tipo", "Kg", "Preço/kg", "Valor", "Status", "Lote"]
+
+
+def test_import_fills_model_defaults_for_missing_columns(engine, tmp_path):
+    # A planilha não tem a coluna "Estabelecimento" (NOT NULL na tabela, padrão "" no modelo).
+    path = _write_csv(tmp_path / "vendas.csv", [
+        VENDAS_HEADER,
+        ["05/03/2024", "Peixaria Central", "Pintado", "Inteiro", "100,000", "15,00", "R$ 1.500,00", "Pago", "L1"],
+        ["06/03/2024", "Mercado Sul", "Caranha", "cortado", "10,5", "20,00", "R$ 210,00", "pendente", "L2"],
+    ])
+
+    report = import_file(engine, "vendas", path)
+
+    assert (report.rows_inserted, report.rows_rejected) == (2, 0)
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT cliente, estabelecimento, total FROM vendas ORDER BY data")).all()
+    assert [tuple(r) for r in rows] == [("Peixaria Central", "", 1500.0), ("Mercado Sul", "", 210.0)]
+
+
+def test_import_rejects_ambiguous_numbers(engine, tmp_path):
+    path = _write_csv(tmp_path / "vendas.csv", [
+        VENDAS_HEADER,
+        ["05/03/2024", "Peixaria Central", "Pintado", "Inteiro", "100", "15", "1,500.00", "Pago", "L1"],
+    ])
+
+    report = import_file(engine, "vendas", path)
+
+    assert (report.rows_inserted, report.rows_rejected) == (0, 1)
+    with open(report.reject_file, encoding="utf-8-sig") as f:
+        rejected = list(csv.reader(f))
+    assert rejected[1][0] == "2" and "ambíguo" in rejected[1][1]
+
+
+ABATES_HEADER = ["Data", "Especie", "Lote", "Peixes", "Kg", "Tanque", "Peso medio"]
+
+
+def _write_abates(path: Path) -> Path:
+    # Planilha separada por vírgula, com ponto decimal e 3 casas nos pesos.
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        csv.writer(f).writerows([
+            ABATES_HEADER,
+            ["05/03/2024", "Pintado", "L1", "300", "450.500", "T1", "1.502"],
+        ])
+    return path
+
+
+def test_import_rejects_three_decimal_places_under_comma_decimal(engine, tmp_path):
+    report = import_file(engine, "abates", _write_abates(tmp_path / "abates.csv"))
+
+    assert (report.rows_inserted, report.rows_rejected) == (0, 1)
+    with open(report.reject_file, encoding="utf-8-sig") as f:
+        rejected = list(csv.reader(f))
+    assert "ambíguo" in rejected[1][1]
+
+
+def test_import_with_decimal_point(engine, tmp_path):
+    report = import_file(engine, "abates", _write_abates(tmp_path / "abates.csv"), decimal=".")
+
+    assert (report.rows_inserted, report.rows_rejected) == (1, 0)
+    with engine.connect() as conn:
+        row = conn.execute(text("SELECT quantidade_kg, peso_medio FROM abates")).one()
+    assert tuple(row) == (450.5, 1.502)
+
+
+def test_import_rejects_unknown_decimal_separator(engine, tmp_path):
+    with pytest.raises(ValueError, match="Separador decimal"):
+        import_file(engine, "abates", _write_abates(tmp_path / "abates.csv"), decimal=";")
+
+
+def _run_cli(*args: str) -> subprocess.CompletedProcess:
+    # Ambiente sem .env: o CLI não deve depender da configuração da aplicação.
+    return subprocess.run(
+        [sys.executable, str(ROOT / "import_data.py"), *args],
+        cwd=ROOT, capture_output=True, text=True, env={"PATH": "", "PYTHONPATH": str(ROOT)},
+    )
+
+
+def test_cli_dry_run_without_env(tmp_path):
+    path = _write_csv(tmp_path / "vendas.csv", [
+        VENDAS_HEADER,
+        ["05/03/2024", "Peixaria Central", "Pintado", "Inteiro", "100", "15", "1500", "Pago", "L1"],
+    ])
+
+    result = _run_cli("vendas", str(path), "--dry-run")
+
+    assert result.returncode == 0, result.stderr
+    assert "Rejeitadas: 0" in result.stdout
+
+
+def test_cli_decimal_option(tmp_path):
+    path = _write_abates(tmp_path / "abates.csv")
+
+    assert "Rejeitadas: 1" in _run_cli("abates", str(path), "--dry-run").stdout
+    assert "Rejeitadas: 0" in _run_cli("abates", str(path), "--dry-run", "--decimal", ".").stdout
+
+
+def test_cli_reports_database_errors_cleanly(tmp_path):
+    path = _write_csv(tmp_path / "vendas.csv", [
+        VENDAS_HEADER,
+        ["05/03/2024", "Peixaria Central", "Pintado", "Inteiro", "100", "15", "1500", "Pago", "L1"],
+    ])
+
+    # Banco sem a tabela 'vendas'.
+    result = _run_cli("vendas", str(path), "--db-url", f"sqlite:///{tmp_path / 'vazio.db'}")
+
+    assert result.returncode == 1
+    assert result.stderr.startswith("Erro: falha no banco de dados")
+    assert "Traceback" not in result.stderr
@@ -0,0 +1,136 @@
+# tests/test_resilience.py
+# Testes do ResilientChatModel (deadline e hedge) contra o servidor LLM falso.
+
+import asyncio
+import threading
+import time
+import uuid
+
+import openai
+import pytest
+from langchain_core.messages import HumanMessage
+from langchain_openai import ChatOpenAI
+
+from app.core.resilience import BudgetExhausted, ResilientChatModel, deadline_scope
+from benchmarks.fake_llm_server import FakeLLMServer, LatencyProfile
+from benchmarks.run_benchmark import abench_pipeline, arun_turn, bench_pipeline, run_turn
+
+MESSAGES = [HumanMessage(content="Quanto vendemos hoje?")]
+
+
+@pytest.fixture
+def server():
+    with FakeLLMServer(latency=LatencyProfile(base=0.01)) as fake:
+        yield fake
+
+
+def make_llm(server: FakeLLMServer, **kwargs) -> ResilientChatModel:
+    inner = ChatOpenAI(model="fake-llm", api_key="fake", base_url=server.base_url, max_retries=0)
+    # Sem amostras de latência, o atraso do hedge é `hedge_initial_delay`.
+    return ResilientChatModel(inner=inner, **{"hedge_initial_delay": 0.2, **kwargs})
+
+
+def invoke(llm: ResilientChatModel, use_async: bool):
+    if use_async:
+        return asyncio.run(llm.ainvoke(MESSAGES))
+    return llm.invoke(MESSAGES)
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_slow_request_is_hedged(server, use_async):
+    server.enqueue("lenta", latency=3.0)
+    server.enqueue("rápida", latency=0.01)
+
+    started = time.monotonic()
+    response = invoke(make_llm(server), use_async)
+
+    assert response.content == "rápida"
+    assert server.requests_served == 2
+    assert time.monotonic() - started < 2.0
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_fast_request_is_not_hedged(server, use_async):
+    server.enqueue("rápida", latency=0.01)
+
+    response = invoke(make_llm(server), use_async)
+
+    assert response.content == "rápida"
+    time.sleep(0.3)
+    assert server.requests_served == 1
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_budget_exhausted_at_deadline(server, use_async):
+    server.latency = LatencyProfile(base=3.0)
+    llm = make_llm(server, max_hedges=0)
+
+    started = time.monotonic()
+    with pytest.raises(BudgetExhausted):
+        with deadline_scope(0.3):
+            invoke(llm, use_async)
+
+    assert time.monotonic() - started < 1.5
+
+
+def test_abandoned_request_stops_at_the_deadline(server):
+    # Sem o timeout, a thread da requisição ficaria presa até o timeout do cliente (600 s).
+    llm = make_llm(server, max_hedges=0)
+    llm.invoke(MESSAGES)  # Aquece o cliente HTTP.
+    server.latency = LatencyProfile(base=3.0)
+
+    with pytest.raises(BudgetExhausted):
+        with deadline_scope(0.3):
+            llm.invoke(MESSAGES)
+
+    time.sleep(0.7)
+    assert not [t for t in threading.enumerate() if t.name == "llm-call"]
+
+
+def test_budget_exhausted_before_call(server):
+    with pytest.raises(BudgetExhausted):
+        with deadline_scope(0):
+            make_llm(server).invoke(MESSAGES)
+
+    assert server.requests_served == 0
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_immediate_error_is_not_hedged(server, use_async):
+    server.enqueue("requisição inválida", latency=0.01, status=400)
+
+    started = time.monotonic()
+    with pytest.raises(openai.BadRequestError):
+        invoke(make_llm(server), use_async)
+
+    assert time.monotonic() - started < 0.2
+    time.sleep(0.3)
+    assert server.requests_served == 1
+
+
+# --- Degradação no grafo completo ---
+
+READ_COMMAND = "Quanto vendemos de Pintado este mês?"
+LLM_LATENCY = 0.3
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_turn_degrades_to_raw_sql_result_at_deadline(tmp_path, use_async):
+    # Orquestrador (0,3 s) e agente SQL (0,3 s) respondem; o orçamento acaba durante
+    # a interpretação do resultado pelo agente SQL. O agente SQL devolve o resultado
+    # bruto e o orquestrador, já sem orçamento, responde com ele sem formatação.
+    deadline = 2.5 * LLM_LATENCY
+    options = dict(scale=0.01, latency=lambda: LLM_LATENCY)
+
+    if use_async:
+        async def turn():
+            async with abench_pipeline(f"sqlite:///{tmp_path / 'bench.db'}", **options) as pipeline:
+                return await arun_turn(pipeline, str(uuid.uuid4()), READ_COMMAND, deadline=deadline)
+        result = asyncio.run(turn())
+    else:
+        with bench_pipeline(**options) as pipeline:
+            result = run_turn(pipeline, str(uuid.uuid4()), READ_COMMAND, deadline=deadline)
+
+    assert result["response"].startswith("⏱️ Não consegui formatar a resposta a tempo. Resultado obtido:")
+    assert "Resultado bruto da consulta" in result["response"]
+    assert result["latency_ms"] < 2000
@@ -0,0 +1,104 @@
+# tests/test_sessions.py
+# Testes do SessionManager (app/core/sessions.py) com um grafo mínimo.
+
+import asyncio
+from typing import Annotated, TypedDict
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+from app.core.sessions import SessionManager
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def _reply(state: State):
+    return {"messages": [AIMessage(content=f"mensagens: {len(state['messages'])}")]}
+
+
+def _graph():
+    builder = StateGraph(State)
+    builder.add_node("responder", _reply)
+    builder.add_edge(START, "responder")
+    builder.add_edge("responder", END)
+    return builder.compile(checkpointer=InMemorySaver())
+
+
+def _inputs(text: str = "oi"):
+    return {"messages": [HumanMessage(content=text)]}
+
+
+def run(coro_fn, tmp_path, **kwargs):
+    async def main():
+        async with AsyncSqliteSaver.from_conn_string(str(tmp_path / "sessions.db")) as durable:
+            async with SessionManager(_graph(), durable, **kwargs) as sessions:
+                return await coro_fn(sessions)
+    return asyncio.run(main())
+
+
+def test_history_survives_eviction_and_rehydration(tmp_path):
+    async def scenario(sessions):
+        users = [f"u{i}" for i in range(10)]
+        for _ in range(3):
+            await asyncio.gather(*[sessions.ainvoke(u, _inputs()) for u in users])
+        state = await sessions.ainvoke("u0", _inputs())
+        return state, sessions.stats()
+
+    state, stats = run(scenario, tmp_path, max_sessions=3)
+
+    assert len(state["messages"]) == 8  # 4 turnos x (pergunta + resposta)
+    assert stats["sessions_in_memory"] <= 3
+    assert stats["evictions"] > 0 and stats["rehydrations"] > 0
+
+
+def test_idle_sessions_are_swept_without_traffic(tmp_path):
+    async def scenario(sessions):
+        await sessions.ainvoke("u1", _inputs())
+        await sessions.ainvoke("u2", _inputs())
+        assert sessions.sessions_in_memory == 2
+        await asyncio.sleep(0.5)
+        return sessions.stats()
+
+    stats = run(scenario, tmp_path, idle_seconds=0.1, sweep_seconds=0.05)
+
+    assert stats["sessions_in_memory"] == 0
+    assert stats["evictions"] == 2
+
+
+def test_sweeper_is_cancelled_on_close(tmp_path):
+    async def scenario(sessions):
+        sweeper = sessions._sweeper
+        assert sweeper is not None and not sweeper.done()
+        await sessions.aclose()
+        return sweeper
+
+    assert run(scenario, tmp_path, idle_seconds=60).cancelled()
+
+
+@pytest.mark.parametrize("stop", ["break", "error"])
+def test_session_is_released_when_stream_stops_early(tmp_path, stop):
+    async def scenario(sessions):
+        try:
+            async with sessions.stream("u1", _inputs()) as events:
+                async for _ in events:
+                    if stop == "error":
+                        raise RuntimeError("falha no consumidor")
+                    break
+        except RuntimeError:
+            pass
+        during = sessions.session_stats("u1")
+        # O próximo turno não pode ficar esperando o lock do anterior.
+        state = await asyncio.wait_for(sessions.ainvoke("u1", _inputs()), timeout=2)
+        return during, state
+
+    during, state = run(scenario, tmp_path)
+
+    assert during["in_flight"] == 0
+    assert not during["in_memory"] or during["turns"] == 1
+    assert state["messages"][-1].content.startswith("mensagens:")